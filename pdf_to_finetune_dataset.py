@@ -8,13 +8,165 @@ Gemini 2.0 Flash modeli kullanılarak soru-cevap çiftleri oluşturulur.
 """
 
 import argparse
+import asyncio
+import concurrent.futures
+import copy
+import datetime
+import hashlib
+import mmap
 import os
 import json
 import csv
+import queue
+import random
+import re
+import shutil
+import sqlite3
+import sys
+import threading
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import fitz as pymupdf  # PyMuPDF kütüphanesi
-import google.generativeai as genai  # Google Generative AI için
+
+# google.generativeai paketinin içe aktarılması yüzlerce milisaniye sürebilir;
+# --help, hatalı argüman ve eksik anahtar yolları bu bedeli ödemesin diye
+# paket ilk API yapılandırmasında _load_genai ile yüklenir
+genai = None  # Google Generative AI için (tembel yüklenir)
+gapi_exceptions = None  # API hata türleri için (tembel yüklenir)
+
+
+def _load_genai() -> None:
+    """google.generativeai modülünü ilk kullanımda içe aktarır
+
+    Modül ve hata türleri, API'ye gerçekten ihtiyaç duyulana kadar
+    yüklenmez; tekrar çağrılması ek maliyet getirmez.
+    """
+    global genai, gapi_exceptions
+    if genai is None:
+        import google.generativeai as _genai
+        from google.api_core import exceptions as _gapi_exceptions
+        genai = _genai
+        gapi_exceptions = _gapi_exceptions
+
+# Yakın kopya soru-cevap çiftlerini elemek için datasketch (isteğe bağlı)
+try:
+    from datasketch import MinHash, MinHashLSH
+except ImportError:
+    MinHash = MinHashLSH = None
+
+# Model yanıtlarını doğrulamak için derlenmiş şema (isteğe bağlı)
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+# Modelden beklenen soru-cevap listesi şeması; model anahtarları bazen
+# İngilizce döndürdüğü için iki anahtar çifti de kabul edilir
+# (_standardize_pairs her ikisini de tek biçime çevirir)
+_QA_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "anyOf": [
+            {"required": ["soru", "cevap"]},
+            {"required": ["question", "answer"]},
+        ],
+        "properties": {
+            "soru": {"type": "string"},
+            "cevap": {"type": "string"},
+            "soru_türü": {"type": "string"},
+            "question": {"type": "string"},
+            "answer": {"type": "string"},
+            "question_type": {"type": "string"},
+        },
+    },
+}
+
+# Anlamsal önbellek için numpy'ı yüklemeyi dene (isteğe bağlı)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Büyük JSON dosyalarını akış halinde okumak için ijson (isteğe bağlı)
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Hızlı JSON çözümleme/yazma için orjson (isteğe bağlı)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _strip_markdown_fence(result: str) -> str:
+    """Yanıttaki Markdown kod bloğu işaretleyicilerini temizler
+
+    Çok KB'lık yanıt metni üzerinde tekrarlı tarama yapmamak için iki
+    str.partition çağrısıyla çalışır; işaretleyici yoksa metin olduğu
+    gibi döner.
+
+    Args:
+        result: Modelden gelen ham yanıt metni
+
+    Returns:
+        Kod bloğu işaretleyicilerinden arındırılmış metin
+    """
+    head, fence, rest = result.partition('```')
+    if not fence or head.strip():
+        return result.strip()
+    # Açılış işaretleyicisinin satırını (``` veya ```json) atla
+    if '\n' in rest:
+        rest = rest.split('\n', 1)[1]
+    body, _, _ = rest.partition('```')
+    return body.strip()
+
+# Uzun metinleri cümle sınırlarından bölmek için desen
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
+
+def _backoff_delay(attempt: int, base: float = 2.0, cap: float = 60.0) -> float:
+    """Üstel geri çekilme süresini titreşim (jitter) ekleyerek hesaplar
+
+    Args:
+        attempt: Kaçıncı deneme olduğu (0 tabanlı)
+        base: İlk denemedeki temel bekleme süresi (saniye)
+        cap: Maksimum bekleme süresi (saniye)
+
+    Returns:
+        Beklenecek süre (saniye)
+    """
+    return min(cap, base * (2 ** attempt)) * random.uniform(0.5, 1.5)
+
+
+def _json_loads(data):
+    """JSON metnini çözümler (orjson kuruluysa onu kullanır)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj) -> str:
+    """Nesneyi tek satırlık JSON metnine çevirir (orjson kuruluysa onu kullanır)"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _json_dump_file(obj, output_file: str) -> None:
+    """Nesneyi girintili JSON olarak dosyaya yazar (orjson kuruluysa onu kullanır)
+
+    orjson doğrudan UTF-8 bayt üretir; bu durumda dosya ikili modda
+    açılarak metin katmanının yeniden kodlaması atlanır.
+    """
+    if orjson is not None:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, ensure_ascii=False, indent=2)
 
 # .env dosyasından çevresel değişkenleri yüklemeyi dene
 try:
@@ -34,14 +186,20 @@ class Config:
     DEFAULT_QUESTIONS_PER_PAGE = 15  # Her sayfa için kaç soru üretileceği
     DEFAULT_MODEL = "gemini-2.0-flash"  # Kullanılacak model
     DEFAULT_OUTPUT_FORMAT = "csv"  # Çıktı formatı
-    
-    def __init__(self, 
+    DEFAULT_MAX_INFLIGHT = 5  # Aynı anda kaç API isteği gönderileceği
+    DEFAULT_NUM_WORKERS = min(os.cpu_count() or 1, 4)  # PDF çıkarma için işlemci sayısı
+    DEFAULT_CACHE_PATH = "qa_cache.db"  # Soru-cevap önbelleğinin dosya yolu
+
+    def __init__(self,
                  api_key: str = None,
                  model: str = DEFAULT_MODEL,
                  batch_size: int = DEFAULT_BATCH_SIZE,
                  questions_per_page: int = DEFAULT_QUESTIONS_PER_PAGE,
                  output_format: str = DEFAULT_OUTPUT_FORMAT,
-                 temperature: float = 0.7):
+                 temperature: float = 0.7,
+                 max_inflight: int = DEFAULT_MAX_INFLIGHT,
+                 num_workers: int = DEFAULT_NUM_WORKERS,
+                 cache_path: Optional[str] = DEFAULT_CACHE_PATH):
         """
         Args:
             api_key: Google API anahtarı
@@ -50,6 +208,9 @@ class Config:
             questions_per_page: Her sayfa için kaç soru üretileceği
             output_format: Çıktı formatı (csv veya json)
             temperature: Model yaratıcılık seviyesi (0.0-1.0)
+            max_inflight: Aynı anda gönderilecek maksimum API isteği sayısı
+            num_workers: PDF metin çıkarma için paralel işlemci sayısı
+            cache_path: Soru-cevap önbelleği dosyasının yolu (None önbelleği kapatır)
         """
         self.api_key = api_key
         self.model = model
@@ -57,91 +218,352 @@ class Config:
         self.questions_per_page = questions_per_page
         self.output_format = output_format
         self.temperature = temperature
+        self.max_inflight = max_inflight
+        self.num_workers = num_workers
+        self.cache_path = cache_path
+
+    def with_overrides(self, **overrides) -> "Config":
+        """Belirtilen alanları değiştirilmiş sığ bir kopya döndürür
+
+        Tüm alanları tek tek yeniden geçirmek yerine mevcut yapılandırma
+        copy.copy ile çoğaltılır ve yalnızca verilen alanlar güncellenir.
+
+        Args:
+            **overrides: Değiştirilecek alan adları ve yeni değerleri
+
+        Returns:
+            Güncellenmiş yeni Config nesnesi
+        """
+        clone = copy.copy(self)
+        for name, value in overrides.items():
+            setattr(clone, name, value)
+        return clone
+
+
+# Düz metin çıkarma için PyMuPDF bayrakları: tire ile bölünen kelimeleri
+# birleştir, boşlukları koru
+_TEXT_FLAGS = pymupdf.TEXT_DEHYPHENATE | pymupdf.TEXT_PRESERVE_WHITESPACE
+
+# Bu uzunluğun altındaki sayfalar (boş sayfa, kapak, içindekiler) atlanır
+_MIN_PAGE_CHARS = 200
+
+# Büyük listelerin dökümünü içeren DEBUG satırları yalnızca DEBUG_PDF
+# ortam değişkeni ayarlandığında basılır; yüzlerce yolun biçimlenip
+# yazılması normal çalıştırmada yalnızca zaman kaybıdır
+_DEBUG = bool(os.environ.get("DEBUG_PDF"))
+
+
+def _log(message: str) -> None:
+    """Sık tekrarlanan ilerleme satırlarını tek write çağrısıyla yazar
+
+    print'in ayırıcı/son ek işleme maliyetini atlar ama metin katmanında
+    kalır; böylece araya giren print çağrılarıyla satır sırası bozulmaz.
+    stdout boruya bağlıyken satır tamponlama kapatıldığından bu satırlar
+    tampon dolunca toplu yazılır; terminalde ise anında görünür. Tek
+    seferlik hata ve özet mesajları için sıradan print kullanılmaya
+    devam eder.
+
+    Args:
+        message: Yazılacak satır
+    """
+    sys.stdout.write(message + '\n')
+
+
+def _open_pdf(pdf_path: str):
+    """PDF'i mmap ile belleğe eşleyerek açar
+
+    Dosya diskten parça parça tekrar okunmak yerine işletim sisteminin
+    sayfa önbelleği üzerinden paylaşılır; aynı dosyayı açan işlemciler
+    arasında fiziksel bellek de paylaşılmış olur.
+
+    Args:
+        pdf_path: PDF dosyasının yolu
+
+    Returns:
+        Açılmış pymupdf belge nesnesi
+    """
+    with open(pdf_path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return pymupdf.open(stream=mm, filetype="pdf")
+
+
+def _extract_range(pdf_path: str, lo: int, hi: int) -> Tuple[int, List[str]]:
+    """Bir sayfa aralığının metinlerini çıkaran işlemci (worker) fonksiyonu
+
+    Her işlemci PDF'i kendisi açar; MuPDF belgeleri işlemciler arasında
+    paylaşılamadığı için dosya yolu üzerinden çalışılır. Çok kısa sayfalar
+    için sayfa numaralandırmasını bozmamak adına boş metin bırakılır.
+
+    Args:
+        pdf_path: PDF dosyasının yolu
+        lo: Aralığın başlangıç sayfa indeksi (dahil)
+        hi: Aralığın bitiş sayfa indeksi (hariç)
+
+    Returns:
+        (başlangıç indeksi, sayfa metinleri listesi) ikilisi
+    """
+    doc = _open_pdf(pdf_path)
+    try:
+        texts = []
+        for i in range(lo, hi):
+            text = doc[i].get_text("text", flags=_TEXT_FLAGS)
+            # Boş/çok kısa sayfa: yer tutucu bırak, API çağrısı yapılmasın
+            texts.append(text if len(text.strip()) >= _MIN_PAGE_CHARS else "")
+        return lo, texts
+    finally:
+        doc.close()
 
 
 class PDFProcessor:
     """PDF dosyasını işleyip metin çıkaran sınıf"""
-    
+
     def __init__(self, config: Config):
         """
         Args:
             config: Program yapılandırması
         """
         self.config = config
-    
-    def convert_pdf_to_text(self, pdf_path: str) -> List[str]:
-        """PDF dosyasını sayfa sayfa metne çevirir
-        
+
+    def get_page_count(self, pdf_path: str) -> int:
+        """PDF dosyasını doğrulayıp sayfa sayısını döndürür
+
         Args:
             pdf_path: PDF dosyasının yolu
-            
+
         Returns:
-            Her bir sayfa için metin listesi
+            Belgedeki sayfa sayısı
         """
-        print(f"DEBUG: PDF dosyası metne dönüştürülmeye başlanıyor: {pdf_path}")
         if not os.path.exists(pdf_path):
             print(f"HATA: PDF dosyası bulunamadı: {pdf_path}")
             raise FileNotFoundError(f"PDF dosyası bulunamadı: {pdf_path}")
-        
+
         try:
             print(f"DEBUG: pymupdf ile PDF açılıyor: {pdf_path}")
-            doc = pymupdf.open(pdf_path)
-            print(f"Belge toplam {doc.page_count} sayfa içeriyor")
+            doc = _open_pdf(pdf_path)
+            page_count = doc.page_count
+            doc.close()
+            print(f"Belge toplam {page_count} sayfa içeriyor")
         except Exception as e:
             print(f"HATA: PDF açılırken sorun oluştu: {e}")
             raise IOError(f"PDF açılırken hata oluştu: {pdf_path}. Hata: {e}")
-        
-        page_texts = []
-        print("DEBUG: Sayfalar metne dönüştürülüyor...")
+
+        return page_count
+
+    def convert_pdf_to_text(self, pdf_path: str) -> List[str]:
+        """PDF dosyasını sayfa sayfa metne çevirir
+
+        Sayfa aralıkları birden fazla işlemciye dağıtılır; her işlemci
+        kendi aralığını çıkarır ve sonuçlar sayfa sırasına göre birleştirilir.
+
+        Args:
+            pdf_path: PDF dosyasının yolu
+
+        Returns:
+            Her bir sayfa için metin listesi
+        """
+        print(f"DEBUG: PDF dosyası metne dönüştürülmeye başlanıyor: {pdf_path}")
+        page_count = self.get_page_count(pdf_path)
+
+        if page_count == 0:
+            return []
+
+        num_workers = min(self.config.num_workers, page_count)
+        print(f"DEBUG: Sayfalar {num_workers} işlemci ile metne dönüştürülüyor...")
+
+        # Sayfaları işlemci sayısı kadar ardışık aralığa böl
+        chunk_size = -(-page_count // num_workers)  # yukarı yuvarlanmış bölme
+        ranges = [(lo, min(lo + chunk_size, page_count))
+                  for lo in range(0, page_count, chunk_size)]
+
+        results = []
         try:
-            for page_num in range(doc.page_count):
-                print(f"DEBUG: Sayfa {page_num+1}/{doc.page_count} işleniyor...")
-                page = doc[page_num]
-                text = page.get_text()
-                # Çok uzun metinlerin uzunluğunu yazdırmayı engelle
-                print(f"DEBUG: Sayfa {page_num+1} metin uzunluğu: {len(text)} karakter")
-                page_texts.append(text)
+            if num_workers == 1:
+                results.append(_extract_range(pdf_path, 0, page_count))
+            else:
+                with concurrent.futures.ProcessPoolExecutor(max_workers=num_workers) as executor:
+                    futures = [executor.submit(_extract_range, pdf_path, lo, hi)
+                               for lo, hi in ranges]
+                    for future in concurrent.futures.as_completed(futures):
+                        results.append(future.result())
         except Exception as e:
-            print(f"HATA: Sayfa {page_num+1} metne dönüştürülürken sorun oluştu: {e}")
+            print(f"HATA: Sayfalar metne dönüştürülürken sorun oluştu: {e}")
             raise
-            
+
+        # Aralıkları başlangıç indeksine göre sıralayıp birleştir
+        page_texts = []
+        for _, texts in sorted(results, key=lambda r: r[0]):
+            page_texts.extend(texts)
+
         print(f"DEBUG: Toplam {len(page_texts)} sayfa metne çevrildi.")
         return page_texts
 
 
-class QAGenerator:
-    """Metin içeriğinden soru-cevap çiftleri oluşturan sınıf"""
-    
-    def __init__(self, config: Config):
+class QACache:
+    """Sayfa metinleri için anlamsal soru-cevap önbelleği
+
+    Daha önce işlenmiş sayfaların (embedding, soru-cevap çiftleri)
+    kayıtlarını SQLite'ta saklar. Birebir aynı metinler SHA256 özeti ile,
+    çok benzer metinler ise embedding kosinüs benzerliği ile yakalanır;
+    her iki durumda da Gemini çağrısı atlanır.
+    """
+
+    EMBEDDING_MODEL = "models/text-embedding-004"  # Embedding için kullanılacak model
+    DEFAULT_THRESHOLD = 0.95  # Kosinüs benzerliği eşiği
+
+    def __init__(self, cache_path: Optional[str] = "qa_cache.db",
+                 threshold: float = DEFAULT_THRESHOLD):
         """
         Args:
-            config: Program yapılandırması
+            cache_path: SQLite önbellek dosyasının yolu (None önbelleği kapatır)
+            threshold: Önbellek isabeti sayılacak minimum kosinüs benzerliği
         """
-        self.config = config
-        
-        # API anahtarını ayarla
-        if config.api_key:
-            genai.configure(api_key=config.api_key)
+        self.threshold = threshold
+        # Normalize edilmiş embedding'leri bellekte tut (satır sırası = id sırası)
+        self._ids: List[int] = []
+        self._embeddings = None
+        self.conn = None
+        if not cache_path:
+            return  # Önbellek kapalı; tüm aramalar boş döner, put yazmaz
+        self.conn = sqlite3.connect(cache_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS qa_cache ("
+            "id INTEGER PRIMARY KEY, "
+            "text_hash TEXT UNIQUE, "
+            "embedding BLOB, "
+            "qa_pairs TEXT)"
+        )
+        self.conn.commit()
+        if np is not None:
+            self._load_embeddings()
+
+    def _load_embeddings(self) -> None:
+        """Kayıtlı embedding'leri tek bir numpy matrisine yükler"""
+        rows = self.conn.execute(
+            "SELECT id, embedding FROM qa_cache WHERE embedding IS NOT NULL ORDER BY id"
+        ).fetchall()
+        if rows:
+            self._ids = [row[0] for row in rows]
+            self._embeddings = np.vstack(
+                [np.frombuffer(row[1], dtype=np.float32) for row in rows]
+            )
         else:
-            # Çevre değişkeninden al
-            api_key = os.environ.get("GOOGLE_API_KEY")
-            if not api_key:
-                raise ValueError("API anahtarı sağlanmadı. Ya config ile ya da GOOGLE_API_KEY çevre değişkeni ile belirtilmeli.")
-            genai.configure(api_key=api_key)
-    
-    def generate_qa_pairs(self, text: str) -> List[Dict[str, str]]:
-        """Metinden soru-cevap çiftleri oluşturur
-        
+            self._ids = []
+            self._embeddings = None
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        """Metnin SHA256 özetini hesaplar"""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_exact(self, text: str) -> Optional[List[Dict[str, str]]]:
+        """Birebir aynı metin için önbellekteki çiftleri döndürür
+
         Args:
-            text: İçerik metni
-            
+            text: Sayfa metni
+
         Returns:
-            Soru-cevap çiftleri listesi
+            Önbellekteki soru-cevap çiftleri, yoksa None
         """
-        print(f"DEBUG: Gemini modeli kullanılarak soru-cevap çiftleri oluşturuluyor")
-        print(f"DEBUG: Kullanılan model: {self.config.model}, sıcaklık: {self.config.temperature}")
-        # Zengin sistem talimatı
-        system_instruction = """
+        if self.conn is None:
+            return None
+        row = self.conn.execute(
+            "SELECT qa_pairs FROM qa_cache WHERE text_hash = ?",
+            (self.text_hash(text),)
+        ).fetchone()
+        if row:
+            return _json_loads(row[0])
+        return None
+
+    def get_similar(self, embedding) -> Optional[List[Dict[str, str]]]:
+        """Embedding'e yeterince benzeyen bir kayıt varsa çiftlerini döndürür
+
+        Args:
+            embedding: Normalize edilmiş sorgu embedding'i (numpy dizisi)
+
+        Returns:
+            Önbellekteki soru-cevap çiftleri, yoksa None
+        """
+        if np is None or self._embeddings is None:
+            return None
+        scores = self._embeddings @ embedding
+        best = int(scores.argmax())
+        if scores[best] > self.threshold:
+            row = self.conn.execute(
+                "SELECT qa_pairs FROM qa_cache WHERE id = ?",
+                (self._ids[best],)
+            ).fetchone()
+            if row:
+                print(f"Önbellek isabeti (benzerlik: {scores[best]:.3f}), API çağrısı atlanıyor")
+                return _json_loads(row[0])
+        return None
+
+    def put(self, text: str, embedding, qa_pairs: List[Dict[str, str]]) -> None:
+        """Yeni bir (metin, embedding, çiftler) kaydı ekler
+
+        Args:
+            text: Sayfa metni
+            embedding: Normalize edilmiş embedding (numpy dizisi veya None)
+            qa_pairs: Kaydedilecek soru-cevap çiftleri
+        """
+        if self.conn is None:
+            return
+        embedding_blob = embedding.astype(np.float32).tobytes() if (np is not None and embedding is not None) else None
+        try:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO qa_cache (text_hash, embedding, qa_pairs) VALUES (?, ?, ?)",
+                (self.text_hash(text), embedding_blob, _json_dumps(qa_pairs))
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Uyarı: Önbelleğe kayıt eklenemedi: {e}")
+            return
+        # Yeni bir satır gerçekten eklendiyse bellekteki matrise yalnızca o
+        # satır iliştirilir; tüm kayıtları SQLite'tan yeniden yüklemek kayıt
+        # sayısı arttıkça her eklemeyi pahalılaştırıyordu
+        if np is not None and embedding is not None and cursor.rowcount == 1:
+            row = embedding.astype(np.float32)[np.newaxis, :]
+            self._ids.append(cursor.lastrowid)
+            self._embeddings = row if self._embeddings is None else np.vstack((self._embeddings, row))
+
+
+class _RateGate:
+    """Süreç genelinde dakikalık istek kotasını uygulayan zaman kapısı
+
+    Havuzdaki her iş parçacığı kendi olay döngüsünü çalıştırdığı için
+    kota ancak iş parçacıkları arasında paylaşılan, kilitle korunan tek
+    bir kapıyla uygulanabilir. reserve() sıradaki boş zaman dilimini
+    ayırır ve çağıranın ne kadar bekleyeceğini döndürür; bekleme çağıranın
+    kendi döngüsünde asyncio.sleep ile yapılır.
+    """
+
+    def __init__(self, max_rate: int, period: float = 60.0):
+        """
+        Args:
+            max_rate: period başına izin verilen istek sayısı
+            period: Kota penceresi (saniye)
+        """
+        self._interval = period / max_rate
+        self._lock = threading.Lock()
+        self._next_slot = 0.0  # time.monotonic tabanlı sıradaki boş dilim
+
+    def reserve(self) -> float:
+        """Bir istek için zaman dilimi ayırır
+
+        Returns:
+            İstek gönderilmeden önce beklenmesi gereken süre (saniye)
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+            return slot - now
+
+
+class QAGenerator:
+    """Metin içeriğinden soru-cevap çiftleri oluşturan sınıf"""
+
+    # Zengin sistem talimatı
+    SYSTEM_INSTRUCTION = """
 # Görevin:
 Sen yüksek kaliteli çeşitli soru-cevap çiftleri oluşturmakla görevlendirilmiş bir yapay zekasın.
 Görevin, verilen metinden insanların sorabileceği çeşitli türlerde sorular üretmek ve bunlara kapsamlı yanıtlar sağlamaktır.
@@ -177,30 +599,163 @@ Yanıt, bilginin ardındaki gerekçeyi anlamak için gerekli bağlamı sağlamal
 
 ### Tekrardan Kaçınma: Tüm soruların belirgin ve benzersiz olduğundan emin ol.
 """
-        
-        # Gemini modeli yapılandırması
-        generation_config = {
+
+    PAGES_PER_PROMPT = 3  # Tek istekte birleştirilecek maksimum sayfa sayısı
+    MAX_PROMPT_CHARS = 8000  # Birleştirilen sayfa metinleri için karakter bütçesi
+    REQUESTS_PER_MINUTE = 60  # Dakika başına gönderilecek maksimum istek sayısı (süreç geneli)
+    API_ENDPOINT = "generativelanguage.googleapis.com"  # Tüm çağrıların paylaştığı uç nokta
+    MAX_PAGE_CHARS = 24000  # Tek istekte gönderilecek maksimum sayfa metni uzunluğu (~6k token)
+    MIN_CACHE_CHARS = 16000  # Bağlam önbelleğinin denenmesi için minimum talimat uzunluğu (~4k token)
+
+    # Sınıf düzeyinde tek kapı: tüm iş parçacıklarındaki üreticiler aynı
+    # kotayı paylaşır, böylece toplam hız dakikalık sınırı aşmaz
+    _rate_gate = _RateGate(REQUESTS_PER_MINUTE)
+
+    def __init__(self, config: Config):
+        """
+        Args:
+            config: Program yapılandırması
+        """
+        self.config = config
+        self.cache = QACache(config.cache_path)
+
+        # API anahtarını ayarla
+        if config.api_key:
+            self._configure_api(config.api_key)
+        else:
+            # Çevre değişkeninden al
+            api_key = os.environ.get("GOOGLE_API_KEY")
+            if not api_key:
+                raise ValueError("API anahtarı sağlanmadı. Ya config ile ya da GOOGLE_API_KEY çevre değişkeni ile belirtilmeli.")
+            self._configure_api(api_key)
+
+        # Modeli bir kez oluştur ve tüm sayfa çağrılarında yeniden kullan;
+        # sistem talimatı böylece her istekte yeniden gönderilmez
+        self.model = self._build_model()
+
+        # Yanıt şemasını bir kez derle (fastjsonschema kuruluysa)
+        self._validator = fastjsonschema.compile(_QA_SCHEMA) if fastjsonschema is not None else None
+
+    def _configure_api(self, api_key: str) -> None:
+        """genai istemcisini kalıcı bağlantı ayarlarıyla yapılandırır
+
+        Uç nokta açıkça belirtilir ve istemci nesneleri genai tarafından
+        önbelleğe alındığı için tüm istekler aynı HTTP/2 (gRPC) kanalı
+        üzerinden çoklanır; her sayfa için TLS el sıkışması tekrarlanmaz.
+        Model nesnesinin yeniden kullanılması kanalı batch boyunca açık tutar.
+
+        Args:
+            api_key: Google API anahtarı
+        """
+        _load_genai()
+        from google.api_core.client_options import ClientOptions
+        genai.configure(
+            api_key=api_key,
+            client_options=ClientOptions(api_endpoint=self.API_ENDPOINT),
+        )
+
+    def _generation_config(self) -> Dict[str, Any]:
+        """Gemini modeli için üretim yapılandırmasını döndürür"""
+        return {
             "temperature": self.config.temperature,
             "top_p": 0.95,
             "top_k": 64,
             "max_output_tokens": 4000,
         }
-        
-        # Model oluştur
-        model = genai.GenerativeModel(
+
+    def _build_model(self) -> "genai.GenerativeModel":
+        """Sistem talimatıyla yapılandırılmış Gemini modeli oluşturur
+
+        Sunucu tarafı bağlam önbelleği (CachedContent) yalnızca talimat
+        API'nin önbelleklenebilir alt sınırını aşacak kadar uzunsa denenir:
+        CachedContent.create gerçek bir ağ turudur ve kısa talimatlarda
+        her açılışta baştan kaybedilmiş bir çağrı olur. Kısa talimat için
+        (ya da deneme başarısız olursa) normal model kullanılır.
+
+        Returns:
+            Kullanıma hazır GenerativeModel nesnesi
+        """
+        if len(self.SYSTEM_INSTRUCTION) >= self.MIN_CACHE_CHARS:
+            try:
+                from google.generativeai import caching
+                cached = caching.CachedContent.create(
+                    model=self.config.model,
+                    system_instruction=self.SYSTEM_INSTRUCTION,
+                    ttl=datetime.timedelta(hours=1),
+                )
+                return genai.GenerativeModel.from_cached_content(
+                    cached_content=cached,
+                    generation_config=self._generation_config()
+                )
+            except Exception as e:
+                print(f"DEBUG: Bağlam önbelleği kullanılamıyor, normal model oluşturuluyor: {e}")
+
+        return genai.GenerativeModel(
             model_name=self.config.model,
-            generation_config=generation_config,
-            system_instruction=system_instruction
+            generation_config=self._generation_config(),
+            system_instruction=self.SYSTEM_INSTRUCTION
         )
-        
+
+    async def _call_model(self, prompt: str):
+        """Modeli süreç genelindeki hız kapısına uyarak çağırır
+
+        Args:
+            prompt: Gönderilecek istem metni
+
+        Returns:
+            Modelin yanıt nesnesi
+        """
+        delay = self._rate_gate.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return await self.model.generate_content_async(prompt)
+
+    async def generate_qa_pairs_async(self, text: str,
+                                      questions: Optional[int] = None) -> List[Dict[str, str]]:
+        """Metinden soru-cevap çiftleri oluşturur (asenkron)
+
+        Args:
+            text: İçerik metni
+            questions: Üretilecek çift sayısı (belirtilmezse yapılandırmadan alınır)
+
+        Returns:
+            Soru-cevap çiftleri listesi
+        """
+        if questions is None:
+            questions = self.config.questions_per_page
+
+        # Girdi bütçesini aşan metinler kesik/boş yanıtlara ve boşa giden
+        # denemelere yol açar; cümle sınırından bölüp parça parça gönder
+        if len(text) > self.MAX_PAGE_CHARS:
+            return await self._generate_for_long_text(text, questions)
+        # Önce önbelleğe bak: birebir aynı metin için embedding bile hesaplanmaz
+        cached_pairs = self.cache.get_exact(text)
+        if cached_pairs is not None:
+            print("Önbellek isabeti (birebir aynı metin), API çağrısı atlanıyor")
+            return cached_pairs
+
+        # Benzer bir sayfa daha önce işlendiyse onun çiftlerini kullan.
+        # Önbellek kapalıyken embedding hesaplamak boşa bir API turu olur:
+        # get_similar hiçbir şey bulamaz ve put sonucu saklamaz
+        embedding = None
+        if self.cache.conn is not None:
+            embedding = await self._embed_text(text)
+            if embedding is not None:
+                cached_pairs = self.cache.get_similar(embedding)
+                if cached_pairs is not None:
+                    return cached_pairs
+
+        print(f"DEBUG: Gemini modeli kullanılarak soru-cevap çiftleri oluşturuluyor")
+        print(f"DEBUG: Kullanılan model: {self.config.model}, sıcaklık: {self.config.temperature}")
+
         prompt = f"""
-        Aşağıdaki metin için yüksek kaliteli {self.config.questions_per_page} soru-cevap çifti oluştur.
+        Aşağıdaki metin için yüksek kaliteli {questions} soru-cevap çifti oluştur.
         Her çiftin soru, cevap ve soru_türü alanlarını içermesini sağla.
         Çeşitli türlerde sorular oluştur.
         Önce metnin dilini belirle, sonra soru-cevap çiftlerini aynı dilde hazırla.
         --------------------------------
         Metin: {text}
-        Soru-cevap çifti sayısı: {self.config.questions_per_page}
+        Soru-cevap çifti sayısı: {questions}
         --------------------------------
         Yanıtını doğrudan JSON formatında ver. Markdown işaretlerini kullanma (```json gibi). Başka açıklama ekleme, sadece düz JSON ver.
         Şu formatta olmalı:
@@ -213,87 +768,476 @@ Yanıt, bilginin ardındaki gerekçeyi anlamak için gerekli bağlamı sağlamal
         # Maksimum 3 deneme
         for attempt in range(3):
             try:
-                response = model.generate_content(prompt)
+                response = await self._call_model(prompt)
                 result = response.text.strip()
                 
                 # JSON yanıtını işle
                 try:
-                    # Markdown kod bloğu olarak döndürme durumunu kontrol et
-                    cleaned_result = result
-                    
                     # Markdown kod bloğu işaretleyicilerini temizle
-                    if cleaned_result.startswith('```'):
-                        # Başlangıçtaki işaretleyicileri bul
-                        first_newline = cleaned_result.find('\n')
-                        if first_newline != -1:
-                            cleaned_result = cleaned_result[first_newline + 1:]
-                        
-                        # Sondaki işaretleyicileri bul
-                        if '```' in cleaned_result:
-                            cleaned_result = cleaned_result[:cleaned_result.rindex('```')]
-                    
-                    # Ekstra boşlukları temizle
-                    cleaned_result = cleaned_result.strip()
-                    
+                    cleaned_result = _strip_markdown_fence(result)
+
+
                     print(f"Temizlenmiş JSON: {cleaned_result[:50]}...")
                     
-                    qa_pairs = json.loads(cleaned_result)
-                    # Formatlama
-                    standardized_pairs = []
-                    for pair in qa_pairs:
-                        # Alan adlarını standartlaştır
-                        standardized_pair = {
-                            "question": pair.get("soru", pair.get("question", "")),
-                            "answer": pair.get("cevap", pair.get("answer", "")),
-                            "question_type": pair.get("soru_türü", pair.get("question_type", ""))
-                        }
-                        standardized_pairs.append(standardized_pair)
+                    qa_pairs = _json_loads(cleaned_result)
+                    standardized_pairs = self._standardize_pairs(qa_pairs)
+                    # Sonraki çalıştırmalar için önbelleğe kaydet
+                    self.cache.put(text, embedding, standardized_pairs)
                     return standardized_pairs
                 except json.JSONDecodeError as e:
                     print(f"JSON çözümleme hatası (Deneme {attempt+1}/3): {e}")
                     print(f"Alınan yanıt: {result[:100]}...")
                     if attempt == 2:  # Son deneme
                         raise
-                    time.sleep(2)  # Tekrar denemeden önce bekle
-                    
+                    await asyncio.sleep(2)  # Tekrar denemeden önce bekle
+
+            except gapi_exceptions.ResourceExhausted as e:
+                if attempt == 2:  # Son deneme
+                    raise
+                delay = _backoff_delay(attempt)
+                print(f"Hız sınırı aşıldı: {e} (Deneme {attempt+1}/3, {delay:.1f} sn bekleniyor)")
+                await asyncio.sleep(delay)
+            except gapi_exceptions.ClientError:
+                # Hız sınırı dışındaki 4xx hataları tekrar denemekle düzelmez
+                raise
             except Exception as e:
-                print(f"Hata oluştu: {e} (Deneme {attempt+1}/3)")
                 if attempt == 2:  # Son deneme
                     raise
-                time.sleep(2)  # Tekrar denemeden önce bekle
-        
+                delay = _backoff_delay(attempt)
+                print(f"Hata oluştu: {e} (Deneme {attempt+1}/3, {delay:.1f} sn bekleniyor)")
+                await asyncio.sleep(delay)
+
         return []  # Tüm denemeler başarısız olursa boş liste döndür
-    
+
+    async def _generate_for_long_text(self, text: str, questions: int) -> List[Dict[str, str]]:
+        """Uzun bir metni cümle sınırlarından bölüp parça parça işler
+
+        Soru sayısı parçalar arasında paylaştırılır; sonuçlar tek listede
+        birleştirilir.
+
+        Args:
+            text: Bütçeyi aşan metin
+            questions: Metnin tamamı için istenen toplam çift sayısı
+
+        Returns:
+            Tüm parçalardan toplanan soru-cevap çiftleri listesi
+        """
+        chunks = []
+        current = []
+        current_chars = 0
+        for sentence in _SENTENCE_SPLIT_RE.split(text):
+            if current and current_chars + len(sentence) > self.MAX_PAGE_CHARS:
+                chunks.append(' '.join(current))
+                current = []
+                current_chars = 0
+            current.append(sentence)
+            current_chars += len(sentence) + 1
+        if current:
+            chunks.append(' '.join(current))
+
+        # Cümle sınırı içermeyen metinlerde (tablolar, dizinler, OCR
+        # çıktıları) parça bütçeyi hâlâ aşabilir; böyle bir parça özyineyle
+        # aynı metne dönüp durmasın diye sabit boyutlu dilimlere bölünür
+        sized_chunks = []
+        for chunk in chunks:
+            if len(chunk) > self.MAX_PAGE_CHARS:
+                sized_chunks.extend(chunk[i:i + self.MAX_PAGE_CHARS]
+                                    for i in range(0, len(chunk), self.MAX_PAGE_CHARS))
+            else:
+                sized_chunks.append(chunk)
+        chunks = sized_chunks
+
+        questions_per_chunk = max(1, questions // len(chunks))
+        print(f"DEBUG: Uzun metin {len(chunks)} parçaya bölündü (parça başına {questions_per_chunk} soru)")
+
+        all_pairs = []
+        for chunk in chunks:
+            all_pairs.extend(await self.generate_qa_pairs_async(chunk, questions=questions_per_chunk))
+        return all_pairs
+
+    def _standardize_pairs(self, qa_pairs: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Modelden gelen çiftleri doğrular ve alan adlarını standartlaştırır
+
+        Derlenmiş şema varsa çiftler önce tip/alan denetiminden geçirilir;
+        hatalı yanıtlar yeniden deneme döngüsüne bırakılır.
+
+        Args:
+            qa_pairs: Modelin döndürdüğü ham soru-cevap sözlükleri
+
+        Returns:
+            question/answer/question_type alanlı soru-cevap çiftleri
+        """
+        if self._validator is not None:
+            self._validator(qa_pairs)
+        standardized_pairs = []
+        for pair in qa_pairs:
+            standardized_pairs.append({
+                "question": pair.get("soru", pair.get("question", "")),
+                "answer": pair.get("cevap", pair.get("answer", "")),
+                "question_type": pair.get("soru_türü", pair.get("question_type", ""))
+            })
+        return standardized_pairs
+
+    async def generate_qa_pairs_for_pages_async(self, pages: List[Tuple[int, str]]) -> List[Tuple[int, List[Dict[str, str]]]]:
+        """Birden fazla sayfayı tek bir istekte işleyip soru-cevap çiftleri oluşturur
+
+        Sayfa metinleri <PAGE n> ayraçlarıyla tek bir prompt'ta birleştirilir;
+        sabit istek maliyeti (ağ gecikmesi, sistem talimatı) sayfalar arasında
+        paylaşılır.
+
+        Args:
+            pages: (sayfa indeksi, sayfa metni) ikilileri listesi
+
+        Returns:
+            (sayfa indeksi, soru-cevap çiftleri) ikilileri listesi
+        """
+        # Tek sayfa için normal (önbellekli) yol yeterli
+        if len(pages) == 1:
+            page_num, text = pages[0]
+            return [(page_num, await self.generate_qa_pairs_async(text))]
+
+        print(f"DEBUG: Sayfalar {pages[0][0]+1}-{pages[-1][0]+1} tek istekte işleniyor")
+
+        pages_text = "\n".join(
+            f"<PAGE {page_num+1}>\n{text}\n</PAGE>" for page_num, text in pages
+        )
+        prompt = f"""
+        Aşağıda <PAGE n> ayraçlarıyla ayrılmış {len(pages)} sayfa metin var.
+        Her sayfa için ayrı ayrı yüksek kaliteli {self.config.questions_per_page} soru-cevap çifti oluştur.
+        Her çiftin soru, cevap ve soru_türü alanlarını içermesini sağla.
+        Çeşitli türlerde sorular oluştur.
+        Önce metnin dilini belirle, sonra soru-cevap çiftlerini aynı dilde hazırla.
+        --------------------------------
+        {pages_text}
+        --------------------------------
+        Yanıtını doğrudan JSON formatında ver. Markdown işaretlerini kullanma (```json gibi). Başka açıklama ekleme, sadece düz JSON ver.
+        Şu formatta olmalı (sayfa alanı <PAGE n> ayracındaki n değeri olmalı):
+        [
+          {{"sayfa": 1, "çiftler": [{{"soru": "...", "cevap": "...", "soru_türü": "..."}}]}},
+          {{"sayfa": 2, "çiftler": [{{"soru": "...", "cevap": "...", "soru_türü": "..."}}]}}
+        ]
+        """
+
+        page_texts_by_num = dict(pages)
+
+        # Maksimum 3 deneme
+        for attempt in range(3):
+            try:
+                response = await self._call_model(prompt)
+                result = response.text.strip()
+
+                try:
+                    cleaned_result = _strip_markdown_fence(result)
+
+                    parsed = _json_loads(cleaned_result)
+                    results = []
+                    for entry in parsed:
+                        page_num = int(entry.get("sayfa", entry.get("page", 0))) - 1
+                        raw_pairs = entry.get("çiftler", entry.get("pairs", []))
+                        if page_num not in page_texts_by_num:
+                            print(f"Uyarı: Model bilinmeyen sayfa numarası döndürdü: {page_num+1}")
+                            continue
+                        standardized_pairs = self._standardize_pairs(raw_pairs)
+                        # Sayfa metni önbelleğe tek tek kaydedilir (embedding'siz)
+                        self.cache.put(page_texts_by_num[page_num], None, standardized_pairs)
+                        results.append((page_num, standardized_pairs))
+
+                    # Modelin yanıtta atladığı (veya yanlış numarayla
+                    # döndürdüğü) sayfalar sessizce kaybolmasın: her biri
+                    # tek sayfalık istekle ayrıca denenir, o da sonuçsuz
+                    # kalırsa boş listeyle raporlanır
+                    answered = {page_num for page_num, _ in results}
+                    for page_num, page_text in pages:
+                        if page_num in answered:
+                            continue
+                        print(f"Uyarı: Sayfa {page_num+1} toplu yanıtta yok, tek başına deneniyor")
+                        try:
+                            retry_pairs = await self.generate_qa_pairs_async(page_text)
+                        except Exception as retry_error:
+                            print(f"Uyarı: Sayfa {page_num+1} tek başına da işlenemedi: {retry_error}")
+                            retry_pairs = []
+                        results.append((page_num, retry_pairs))
+                    return results
+                except (json.JSONDecodeError, ValueError) as e:
+                    print(f"JSON çözümleme hatası (Deneme {attempt+1}/3): {e}")
+                    print(f"Alınan yanıt: {result[:100]}...")
+                    if attempt == 2:  # Son deneme
+                        raise
+                    await asyncio.sleep(2)  # Tekrar denemeden önce bekle
+
+            except gapi_exceptions.ResourceExhausted as e:
+                if attempt == 2:  # Son deneme
+                    raise
+                delay = _backoff_delay(attempt)
+                print(f"Hız sınırı aşıldı: {e} (Deneme {attempt+1}/3, {delay:.1f} sn bekleniyor)")
+                await asyncio.sleep(delay)
+            except gapi_exceptions.ClientError:
+                # Hız sınırı dışındaki 4xx hataları tekrar denemekle düzelmez
+                raise
+            except Exception as e:
+                if attempt == 2:  # Son deneme
+                    raise
+                delay = _backoff_delay(attempt)
+                print(f"Hata oluştu: {e} (Deneme {attempt+1}/3, {delay:.1f} sn bekleniyor)")
+                await asyncio.sleep(delay)
+
+        return [(page_num, []) for page_num, _ in pages]
+
+    async def _embed_text(self, text: str):
+        """Metnin normalize edilmiş embedding'ini hesaplar
+
+        Args:
+            text: Sayfa metni
+
+        Returns:
+            Normalize edilmiş float32 numpy dizisi; numpy yoksa veya
+            hesaplama başarısız olursa None
+        """
+        if np is None:
+            return None
+        try:
+            result = await asyncio.to_thread(
+                genai.embed_content, model=QACache.EMBEDDING_MODEL, content=text)
+            vec = np.asarray(result["embedding"], dtype=np.float32)
+            norm = np.linalg.norm(vec)
+            return vec / norm if norm else None
+        except Exception as e:
+            print(f"Uyarı: Embedding hesaplanamadı: {e}")
+            return None
+
+    @classmethod
+    def _chunk_pages(cls, pages: List[Tuple[int, str]]) -> List[List[Tuple[int, str]]]:
+        """Sayfaları tek istekte gönderilecek gruplara böler
+
+        Bir grupta en fazla PAGES_PER_PROMPT sayfa bulunur ve toplam metin
+        uzunluğu MAX_PROMPT_CHARS değerini aşamaz; bütçeyi tek başına aşan
+        sayfalar kendi grubunda gönderilir.
+
+        Args:
+            pages: (sayfa indeksi, sayfa metni) ikilileri listesi
+
+        Returns:
+            Sayfa gruplarının listesi
+        """
+        chunks = []
+        current = []
+        current_chars = 0
+        for page_num, text in pages:
+            if current and (len(current) >= cls.PAGES_PER_PROMPT
+                            or current_chars + len(text) > cls.MAX_PROMPT_CHARS):
+                chunks.append(current)
+                current = []
+                current_chars = 0
+            current.append((page_num, text))
+            current_chars += len(text)
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def _generate_for_chunk(self, semaphore: asyncio.Semaphore,
+                                  chunk: List[Tuple[int, str]]) -> List[Tuple[int, List[Dict[str, str]]]]:
+        """Bir sayfa grubu için soru-cevap çiftlerini üretir (eşzamanlılık sınırlı)
+
+        Args:
+            semaphore: Eşzamanlı istek sayısını sınırlayan semafor
+            chunk: (sayfa indeksi, sayfa metni) ikilileri listesi
+
+        Returns:
+            (sayfa indeksi, soru-cevap çiftleri) ikilileri listesi
+        """
+        async with semaphore:
+            if len(chunk) == 1:
+                page_num, page_text = chunk[0]
+                _log(f"Sayfa {page_num+1} işleniyor...")
+                qa_pairs = await self.generate_qa_pairs_async(page_text)
+                return [(page_num, qa_pairs)]
+            return await self.generate_qa_pairs_for_pages_async(chunk)
+
     def process_batch(self, page_texts: List[str], start_index: int) -> List[Dict[str, str]]:
-        """Bir grup sayfayı işler ve soru-cevap çiftleri oluşturur
-        
+        """Bir grup sayfayı paralel olarak işler ve soru-cevap çiftleri oluşturur
+
+        Sayfalar önce karakter bütçesine göre gruplara bölünür; kısa sayfalar
+        tek istekte birleştirilir. Gruplar eşzamanlı gönderilir ve aynı anda
+        en fazla max_inflight istek açık tutulur.
+
         Args:
             page_texts: İşlenecek sayfa metinleri listesi
             start_index: Sayfaların başlangıç indeksi
-            
+
         Returns:
             Oluşturulan soru-cevap çiftleri listesi
         """
-        all_qa_pairs = []
-        
+        # Boş sayfalar (çıkarma sırasında elenenler) hiç işleme alınmaz
+        pages = []
         for i, page_text in enumerate(page_texts):
             page_num = start_index + i
-            print(f"Sayfa {page_num+1} işleniyor...")
-            
-            qa_pairs = self.generate_qa_pairs(page_text)
+            if not page_text.strip():
+                _log(f"Sayfa {page_num+1} boş, atlanıyor")
+                continue
+            pages.append((page_num, page_text))
+
+        # Önbellekte birebir bulunan sayfalar gruplamaya girmez
+        cached_results = []
+        pending_pages = []
+        for page_num, page_text in pages:
+            cached_pairs = self.cache.get_exact(page_text)
+            if cached_pairs is not None:
+                _log(f"Sayfa {page_num+1} önbellekten alındı")
+                cached_results.append((page_num, cached_pairs))
+            else:
+                pending_pages.append((page_num, page_text))
+
+        chunks = self._chunk_pages(pending_pages)
+
+        async def _run_batch():
+            semaphore = asyncio.Semaphore(self.config.max_inflight)
+            tasks = [self._generate_for_chunk(semaphore, chunk) for chunk in chunks]
+            return await asyncio.gather(*tasks, return_exceptions=True)
+
+        results = asyncio.run(_run_batch()) if chunks else []
+
+        all_qa_pairs = []
+        # Sayfa sırasını korumak için sonuçları indekse göre sırala
+        page_results = list(cached_results)
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Hata: Sayfa grubu işlenirken sorun oluştu: {result}")
+                continue
+            page_results.extend(result)
+        page_results.sort(key=lambda r: r[0])
+
+        for page_num, qa_pairs in page_results:
             if qa_pairs:
                 # Her çifte sayfa numarası ekle
                 for pair in qa_pairs:
                     pair["page"] = page_num + 1
-                
+
                 all_qa_pairs.extend(qa_pairs)
-                print(f"Sayfa {page_num+1} için {len(qa_pairs)} soru-cevap çifti oluşturuldu")
+                _log(f"Sayfa {page_num+1} için {len(qa_pairs)} soru-cevap çifti oluşturuldu")
             else:
-                print(f"Sayfa {page_num+1} için soru-cevap çifti oluşturulamadı")
-        
+                _log(f"Sayfa {page_num+1} için soru-cevap çifti oluşturulamadı")
+
         return all_qa_pairs
 
 
+class _QADeduplicator:
+    """MinHash/LSH ile yakın kopya soru-cevap çiftlerini eleyen yardımcı sınıf
+
+    Soru+cevap metninin 5-gram parçalarından MinHash imzası çıkarılır;
+    Jaccard benzerliği eşiği aşan çiftler kopya sayılır. datasketch
+    kurulu değilse hiçbir çift elenmez.
+    """
+
+    THRESHOLD = 0.9  # Kopya sayılacak minimum Jaccard benzerliği
+    NUM_PERM = 64  # MinHash permütasyon sayısı
+    SHINGLE_SIZE = 5  # Karakter n-gram uzunluğu
+
+    def __init__(self):
+        self.lsh = MinHashLSH(threshold=self.THRESHOLD, num_perm=self.NUM_PERM) if MinHashLSH is not None else None
+        self.kept = 0
+        self.dropped = 0
+
+    def is_duplicate(self, question: str, answer: str) -> bool:
+        """Çiftin daha önce görülen bir çiftin yakın kopyası olup olmadığına bakar
+
+        Args:
+            question: Soru metni
+            answer: Cevap metni
+
+        Returns:
+            Çift kopyaysa True; değilse çift kaydedilir ve False döner
+        """
+        if self.lsh is None:
+            self.kept += 1
+            return False
+
+        text = f"{question or ''} {answer or ''}"
+        mh = MinHash(num_perm=self.NUM_PERM)
+        for i in range(max(1, len(text) - self.SHINGLE_SIZE + 1)):
+            mh.update(text[i:i + self.SHINGLE_SIZE].encode('utf-8'))
+
+        if self.lsh.query(mh):
+            self.dropped += 1
+            return True
+
+        self.lsh.insert(str(self.kept), mh)
+        self.kept += 1
+        return False
+
+    def report(self) -> None:
+        """Eleme oranını yazdırır"""
+        total = self.kept + self.dropped
+        if self.dropped and total:
+            print(f"Yakın kopya eleme: {self.dropped}/{total} çift elendi (%{100 * self.dropped / total:.1f})")
+
+
+class _MergedCSVWriter:
+    """Kitap çıktılarını işleme sürerken birleşik CSV'ye akıtan yardımcı sınıf
+
+    Her kitabın CSV'si tamamlandığı anda satırları birleşik dosyaya
+    eklenir; işlem sonunda tüm çıktıların yeniden okunmasına gerek kalmaz.
+    Dosya ilk kitabın başlığıyla tembel açılır, kaynak sütunu eklenir ve
+    yakın kopya çiftler elenir. append_file birden fazla iş parçacığından
+    güvenle çağrılabilir.
+    """
+
+    def __init__(self, output_prefix: str):
+        self.output_file = f"{output_prefix}.csv"
+        self.total_rows = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._writer = None
+        self._deduplicator = _QADeduplicator()
+
+    def append_file(self, file_path: str) -> None:
+        """Bir kitabın CSV çıktısındaki satırları birleşik dosyaya ekler
+
+        Args:
+            file_path: Eklenecek kitabın CSV dosya yolu
+        """
+        with self._lock:
+            try:
+                with open(file_path, 'r', encoding='utf-8', newline='') as infile:
+                    csv_reader = csv.DictReader(infile)
+
+                    if self._writer is None:
+                        fieldnames = list(csv_reader.fieldnames or [])
+                        if not fieldnames:
+                            return
+                        if 'kaynak' not in fieldnames:
+                            fieldnames.append('kaynak')
+                        self._file = open(self.output_file, 'w', encoding='utf-8',
+                                          newline='', buffering=1 << 20)
+                        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames,
+                                                      extrasaction='ignore')
+                        self._writer.writeheader()
+
+                    # Dosya adını kaynak olarak ekle
+                    book_name = os.path.splitext(os.path.basename(file_path))[0]
+                    for row in csv_reader:
+                        # Yakın kopya çiftleri veri setine alma
+                        if self._deduplicator.is_duplicate(row.get('question'), row.get('answer')):
+                            continue
+                        row['kaynak'] = book_name
+                        self._writer.writerow(row)
+                        self.total_rows += 1
+            except Exception as e:
+                print(f"Uyarı: {file_path} dosyası birleştirilemedi: {e}")
+
+    def close(self) -> None:
+        """Birleşik dosyayı kapatır ve özet bilgisini yazdırır"""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.close()
+            self._deduplicator.report()
+            if self.total_rows:
+                print(f"Tüm kitaplardan {self.total_rows} soru-cevap çifti {self.output_file} dosyasına birleştirildi.")
+            else:
+                os.remove(self.output_file)
+                print("Birleştirilecek veri bulunamadı.")
+
+
 class OutputManager:
     """Soru-cevap çiftlerini dosyaya kaydeden sınıf"""
     
@@ -315,90 +1259,227 @@ class OutputManager:
             self._merge_multiple_csv_files(file_paths, output_prefix)
         else: # json
             self._merge_multiple_json_files(file_paths, output_prefix)
-            
+
+    def merge_multiple_files_fast(self, file_paths: List[str], output_prefix: str) -> None:
+        """Aynı başlıklı CSV dosyalarını ayrıştırmadan bayt olarak birleştirir
+
+        Tüm dosyalar aynı başlık satırını taşıyorsa başlık bir kez yazılır
+        ve kalan içerik shutil.copyfileobj ile 1 MiB'lık parçalar halinde
+        kopyalanır. Bu yol kaynak sütunu eklemez ve kopya eleme yapmaz;
+        başlıklar uyuşmuyorsa veya format JSON ise ayrıştırıcılı
+        merge_multiple_files yoluna geri dönülür.
+
+        Args:
+            file_paths: Birleştirilecek dosya yolları listesi
+            output_prefix: Çıktı dosyasının öneki
+        """
+        if self.config.output_format.lower() != "csv":
+            self.merge_multiple_files(file_paths, output_prefix)
+            return
+
+        headers = {}
+        for file_path in file_paths:
+            try:
+                with open(file_path, 'rb') as f:
+                    headers[file_path] = f.readline()
+            except Exception as e:
+                print(f"Uyarı: {file_path} dosyası okunamadı: {e}")
+
+        if not headers:
+            print("Birleştirilecek veri bulunamadı.")
+            return
+
+        if len(set(headers.values())) != 1:
+            # Başlıklar farklı: alan hizalaması gerektiği için ayrıştırıcılı yola dön
+            self.merge_multiple_files(file_paths, output_prefix)
+            return
+
+        # Hızlı yolda kayıtlar ayrıştırılmadığı için sayılmaz: fiziksel satır
+        # sayısı, tırnak içinde satır sonu taşıyan cevaplar yüzünden gerçek
+        # kayıt sayısından fazla çıkar
+        output_file = f"{output_prefix}.csv"
+        with open(output_file, 'wb') as outfile:
+            outfile.write(next(iter(headers.values())))
+            for file_path in headers:
+                with open(file_path, 'rb') as f:
+                    f.readline()  # Başlık satırını atla
+                    shutil.copyfileobj(f, outfile, length=1 << 20)
+
+        print(f"Tüm kitaplardaki soru-cevap çiftleri {output_file} dosyasına birleştirildi.")
+
     def _merge_multiple_csv_files(self, file_paths: List[str], output_prefix: str) -> None:
-        """Birden fazla CSV dosyasını tek bir dosyada birleştirir
-        
+        """Birden fazla CSV dosyasını akış halinde tek bir dosyada birleştirir
+
+        Satırlar bellekte biriktirilmez: ilk geçişte yalnızca başlıklar
+        okunarak alan listesi çıkarılır, ikinci geçişte satırlar doğrudan
+        çıktı dosyasına aktarılır.
+
         Args:
             file_paths: Birleştirilecek CSV dosya yolları listesi
             output_prefix: Çıktı dosyasının öneki
         """
-        all_rows = []
+        # 1. geçiş: yalnızca başlık satırlarını okuyarak tüm alanları belirle
+        all_fields = set()
         for file_path in file_paths:
             try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    csv_reader = csv.DictReader(file)
-                    
-                    # Dosya adını kaynak olarak ekle
-                    book_name = os.path.splitext(os.path.basename(file_path))[0]
-                    
-                    for row in csv_reader:
-                        # Kitap bilgisini ekle
-                        row['kaynak'] = book_name
-                        all_rows.append(row)
+                with open(file_path, 'r', encoding='utf-8', newline='') as file:
+                    header = next(csv.reader(file), None)
+                    if header:
+                        all_fields.update(header)
             except Exception as e:
-                print(f"Uyarı: {file_path} dosyası birleştirilemedi: {e}")
-        
-        if all_rows:
-            output_file = f"{output_prefix}.csv"
-            with open(output_file, 'w', encoding='utf-8', newline='') as file:
-                # Tüm alanları belirle (kaynak alanını da ekleyerek)
-                # Tüm satırlardaki mevcut alanları belirle
-                all_fields = set()
-                for row in all_rows:
-                    all_fields.update(row.keys())
-                
-                # Önemli alanların sırasını korumak için sıralı alanlar listesi
-                # Öncelikli alanlar
-                priority_fields = ['question', 'answer', 'question_type', 'page', 'kaynak']
-                
-                # Son alan listesi - önce öncelikli alanlar, sonra diğerleri
-                fieldnames = [f for f in priority_fields if f in all_fields]
-                
-                # Kalan alanları ekle
-                for field in all_fields:
-                    if field not in fieldnames:
-                        fieldnames.append(field)
-                
-                csv_writer = csv.DictWriter(file, fieldnames=fieldnames)
-                csv_writer.writeheader()
-                csv_writer.writerows(all_rows)
-                
-            print(f"Tüm kitaplardan {len(all_rows)} soru-cevap çifti {output_file} dosyasına birleştirildi.")
+                print(f"Uyarı: {file_path} dosyasının başlığı okunamadı: {e}")
+
+        if not all_fields:
+            print("Birleştirilecek veri bulunamadı.")
+            return
+
+        all_fields.add('kaynak')
+
+        # Önemli alanların sırasını korumak için sıralı alanlar listesi
+        priority_fields = ['question', 'answer', 'question_type', 'page', 'kaynak']
+        fieldnames = [f for f in priority_fields if f in all_fields]
+        for field in all_fields:
+            if field not in fieldnames:
+                fieldnames.append(field)
+
+        # 2. geçiş: satırları doğrudan çıktı dosyasına aktar
+        total_rows = 0
+        deduplicator = _QADeduplicator()
+        output_file = f"{output_prefix}.csv"
+        with open(output_file, 'w', encoding='utf-8', newline='', buffering=1 << 20) as file:
+            csv_writer = csv.DictWriter(file, fieldnames=fieldnames, extrasaction='ignore')
+            csv_writer.writeheader()
+
+            for file_path in file_paths:
+                try:
+                    with open(file_path, 'r', encoding='utf-8', newline='') as infile:
+                        csv_reader = csv.DictReader(infile)
+
+                        # Dosya adını kaynak olarak ekle
+                        book_name = os.path.splitext(os.path.basename(file_path))[0]
+
+                        for row in csv_reader:
+                            # Yakın kopya çiftleri veri setine alma
+                            if deduplicator.is_duplicate(row.get('question'), row.get('answer')):
+                                continue
+                            # Kitap bilgisini ekle
+                            row['kaynak'] = book_name
+                            csv_writer.writerow(row)
+                            total_rows += 1
+                except Exception as e:
+                    print(f"Uyarı: {file_path} dosyası birleştirilemedi: {e}")
+
+        deduplicator.report()
+
+        if total_rows:
+            print(f"Tüm kitaplardan {total_rows} soru-cevap çifti {output_file} dosyasına birleştirildi.")
+        else:
+            os.remove(output_file)
+            print("Birleştirilecek veri bulunamadı.")
+
+    def merge_json_files_to_csv(self, file_paths: List[str], output_prefix: str) -> None:
+        """JSON kitap çıktılarını kaynak sütunlu tek bir CSV'de birleştirir
+
+        JSON gövdelerinin bayt olarak yapıştırılması geçerli bir dosya
+        üretmez; öğeler akış halinde ayrıştırılır ve CSV satırlarına
+        çevrilerek yazılır. Yakın kopya çiftler elenir.
+
+        Args:
+            file_paths: Birleştirilecek JSON dosya yolları listesi
+            output_prefix: Çıktı dosyasının öneki
+        """
+        fieldnames = ['question', 'answer', 'question_type', 'page', 'kaynak']
+        total_rows = 0
+        deduplicator = _QADeduplicator()
+        output_file = f"{output_prefix}.csv"
+        with open(output_file, 'w', encoding='utf-8', newline='', buffering=1 << 20) as file:
+            csv_writer = csv.DictWriter(file, fieldnames=fieldnames, extrasaction='ignore')
+            csv_writer.writeheader()
+
+            for file_path in file_paths:
+                try:
+                    with open(file_path, 'r', encoding='utf-8') as infile:
+                        # Dosya adını kaynak olarak ekle
+                        book_name = os.path.splitext(os.path.basename(file_path))[0]
+
+                        for item in self._iter_json_items(infile):
+                            # Yakın kopya çiftleri veri setine alma
+                            if deduplicator.is_duplicate(item.get('question'), item.get('answer')):
+                                continue
+                            row = dict(item)
+                            row['kaynak'] = book_name
+                            csv_writer.writerow(row)
+                            total_rows += 1
+                except Exception as e:
+                    print(f"Uyarı: {file_path} dosyası birleştirilemedi: {e}")
+
+        deduplicator.report()
+
+        if total_rows:
+            print(f"Tüm kitaplardan {total_rows} soru-cevap çifti {output_file} dosyasına birleştirildi.")
         else:
+            os.remove(output_file)
             print("Birleştirilecek veri bulunamadı.")
-            
+
+    @staticmethod
+    def _iter_json_items(file):
+        """Bir JSON dizi dosyasının öğelerini akış halinde döndürür
+
+        ijson kuruluysa dosya parça parça çözümlenir; değilse json.load
+        ile tamamı belleğe okunur.
+
+        Args:
+            file: Açık JSON dosya nesnesi
+
+        Returns:
+            Soru-cevap sözlüklerini üreten iteratör
+        """
+        if ijson is not None:
+            yield from ijson.items(file, 'item')
+        else:
+            yield from _json_loads(file.read())
+
     def _merge_multiple_json_files(self, file_paths: List[str], output_prefix: str) -> None:
-        """Birden fazla JSON dosyasını tek bir dosyada birleştirir
-        
+        """Birden fazla JSON dosyasını akış halinde tek bir dosyada birleştirir
+
         Args:
             file_paths: Birleştirilecek JSON dosya yolları listesi
             output_prefix: Çıktı dosyasının öneki
         """
-        all_qa_pairs = []
-        
-        for file_path in file_paths:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    qa_pairs = json.load(file)
-                    
-                    # Dosya adını kaynak olarak ekle
-                    book_name = os.path.splitext(os.path.basename(file_path))[0]
-                    
-                    for qa_pair in qa_pairs:
-                        # Kitap bilgisini ekle
-                        qa_pair['kaynak'] = book_name
-                        all_qa_pairs.append(qa_pair)
-            except Exception as e:
-                print(f"Uyarı: {file_path} dosyası birleştirilemedi: {e}")
-        
-        if all_qa_pairs:
-            output_file = f"{output_prefix}.json"
-            with open(output_file, 'w', encoding='utf-8') as file:
-                json.dump(all_qa_pairs, file, ensure_ascii=False, indent=2)
-                
-            print(f"Tüm kitaplardan {len(all_qa_pairs)} soru-cevap çifti {output_file} dosyasına birleştirildi.")
+        total_pairs = 0
+        deduplicator = _QADeduplicator()
+        output_file = f"{output_prefix}.json"
+
+        with open(output_file, 'w', encoding='utf-8') as outfile:
+            outfile.write('[\n')
+
+            for file_path in file_paths:
+                try:
+                    with open(file_path, 'r', encoding='utf-8') as file:
+                        # Dosya adını kaynak olarak ekle
+                        book_name = os.path.splitext(os.path.basename(file_path))[0]
+
+                        for qa_pair in self._iter_json_items(file):
+                            # Yakın kopya çiftleri veri setine alma
+                            if deduplicator.is_duplicate(qa_pair.get('question'), qa_pair.get('answer')):
+                                continue
+                            # Kitap bilgisini ekle
+                            qa_pair['kaynak'] = book_name
+                            if total_pairs:
+                                outfile.write(',\n')
+                            outfile.write(_json_dumps(qa_pair))
+                            total_pairs += 1
+                except Exception as e:
+                    print(f"Uyarı: {file_path} dosyası birleştirilemedi: {e}")
+
+            outfile.write('\n]\n')
+
+        deduplicator.report()
+
+        if total_pairs:
+            print(f"Tüm kitaplardan {total_pairs} soru-cevap çifti {output_file} dosyasına birleştirildi.")
         else:
+            os.remove(output_file)
             print("Birleştirilecek veri bulunamadı.")
     
     def save_to_csv(self, qa_pairs: List[Dict[str, str]], filename: str) -> None:
@@ -414,13 +1495,13 @@ class OutputManager:
             
         output_file = f"{filename}.csv"
         
-        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+        # Geniş tampon sistem çağrısı sayısını azaltır; satırlar tek seferde yazılır
+        with open(output_file, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
             fieldnames = ['question', 'answer', 'question_type', 'page']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
+
             writer.writeheader()
-            for item in qa_pairs:
-                writer.writerow(item)
+            writer.writerows(qa_pairs)
         
         print(f"{len(qa_pairs)} soru-cevap çifti {output_file} dosyasına kaydedildi")
     
@@ -436,9 +1517,8 @@ class OutputManager:
             return
             
         output_file = f"{filename}.json"
-        
-        with open(output_file, 'w', encoding='utf-8') as jsonfile:
-            json.dump(qa_pairs, jsonfile, ensure_ascii=False, indent=2)
+
+        _json_dump_file(qa_pairs, output_file)
         
         print(f"{len(qa_pairs)} soru-cevap çifti {output_file} dosyasına kaydedildi")
     
@@ -462,49 +1542,80 @@ class OutputManager:
             batch_count: Toplam batch sayısı
         """
         merged_filename = f"{output_prefix}_all"
-        
-        # Tüm veri setini saklamak için liste
-        all_qa_pairs = []
-        
+        total_pairs = 0
+
         if self.config.output_format.lower() == 'json':
+            # Tüm veri setini saklamak için liste
+            all_qa_pairs = []
+
             # JSON dosyalarını birleştir
             for i in range(1, batch_count + 1):
                 batch_file = f"{output_prefix}_batch_{i}.json"
                 try:
                     with open(batch_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
+                        data = _json_loads(f.read())
                         all_qa_pairs.extend(data)
                 except Exception as e:
                     print(f"Uyarı: {batch_file} dosyası okunamadı: {e}")
-            
+
+            total_pairs = len(all_qa_pairs)
             # Birleştirilmiş JSON'ı kaydet
             self.save_to_json(all_qa_pairs, merged_filename)
-            
+
         else:  # CSV dosyaları için
-            # İlk dosyadan başlıkları al
-            with open(f"{output_prefix}_batch_1.csv", 'r', newline='', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                headers = next(reader)  # İlk satır başlıklar
-            
-            # Birleştirilmiş CSV'yi oluştur
-            with open(f"{merged_filename}.csv", 'w', newline='', encoding='utf-8') as outfile:
-                writer = csv.writer(outfile)
-                writer.writerow(headers)  # Başlıkları yaz
-                
-                # Tüm batch dosyalarını oku ve birleştir
-                for i in range(1, batch_count + 1):
-                    batch_file = f"{output_prefix}_batch_{i}.csv"
-                    try:
-                        with open(batch_file, 'r', newline='', encoding='utf-8') as f:
-                            reader = csv.reader(f)
-                            next(reader)  # Başlık satırını atla
-                            for row in reader:
-                                writer.writerow(row)
-                                all_qa_pairs.append(row)  # Satır sayısını saymak için
-                    except Exception as e:
-                        print(f"Uyarı: {batch_file} dosyası okunamadı: {e}")
-        
-        print(f"\nTüm batch'ler birleştirildi: {len(all_qa_pairs)} soru-cevap çifti {merged_filename}.{self.config.output_format} dosyasına kaydedildi")
+            batch_files = [f"{output_prefix}_batch_{i}.csv" for i in range(1, batch_count + 1)]
+
+            # Tüm batch dosyaları aynı başlığı taşıyorsa satırlar ayrıştırılmadan
+            # ham bayt olarak kopyalanabilir
+            headers = {}
+            for batch_file in batch_files:
+                try:
+                    with open(batch_file, 'rb') as f:
+                        headers[batch_file] = f.readline()
+                except Exception as e:
+                    print(f"Uyarı: {batch_file} dosyası okunamadı: {e}")
+
+            if not headers:
+                print("Uyarı: Birleştirilecek batch dosyası bulunamadı.")
+                return
+
+            if len(set(headers.values())) == 1:
+                # Hızlı yol: başlığı bir kez yaz, kalan içeriği bayt olarak
+                # kopyala. Kayıtlar ayrıştırılmadığı için burada sayılmaz;
+                # fiziksel satır sayısı, tırnak içinde satır sonu taşıyan
+                # cevaplar yüzünden gerçek kayıt sayısından fazla çıkar
+                total_pairs = None
+                with open(f"{merged_filename}.csv", 'wb') as outfile:
+                    outfile.write(next(iter(headers.values())))
+                    for batch_file in headers:
+                        with open(batch_file, 'rb') as f:
+                            f.readline()  # Başlık satırını atla
+                            shutil.copyfileobj(f, outfile, length=1 << 20)
+            else:
+                # Başlıklar farklıysa satır satır birleştirmeye geri dön
+                first_file = next(iter(headers))
+                with open(first_file, 'r', newline='', encoding='utf-8') as f:
+                    fieldnames = next(csv.reader(f))
+
+                with open(f"{merged_filename}.csv", 'w', newline='', encoding='utf-8') as outfile:
+                    writer = csv.writer(outfile)
+                    writer.writerow(fieldnames)
+
+                    for batch_file in headers:
+                        try:
+                            with open(batch_file, 'r', newline='', encoding='utf-8') as f:
+                                reader = csv.reader(f)
+                                next(reader)  # Başlık satırını atla
+                                for row in reader:
+                                    writer.writerow(row)
+                                    total_pairs += 1
+                        except Exception as e:
+                            print(f"Uyarı: {batch_file} dosyası okunamadı: {e}")
+
+        if total_pairs is None:
+            print(f"\nTüm batch'ler birleştirildi: soru-cevap çiftleri {merged_filename}.{self.config.output_format} dosyasına kaydedildi")
+        else:
+            print(f"\nTüm batch'ler birleştirildi: {total_pairs} soru-cevap çifti {merged_filename}.{self.config.output_format} dosyasına kaydedildi")
         
     def merge_all_dataset_files(self) -> None:
         """Farklı PDF'lerden elde edilen CSV dosyalarını birleştirir.
@@ -598,85 +1709,265 @@ class FineTuneDatasetGenerator:
     
     def generate_dataset(self, pdf_path: str, output_prefix: Optional[str] = None) -> None:
         """PDF'den fine-tune veri seti oluşturur
-        
+
+        İş üç aşamalı bir boru hattı olarak yürütülür: bir iş parçacığı
+        sayfa metinlerini batch'ler halinde çıkarır, ana iş parçacığı
+        soru-cevap üretimini yürütür, bir yazıcı iş parçacığı sonuçları
+        diske kaydeder. Böylece PDF işleme (CPU), API çağrıları (ağ) ve
+        dosya yazma (disk) birbirini beklemek yerine üst üste biner.
+
         Args:
             pdf_path: PDF dosyasının yolu
             output_prefix: Çıktı dosyalarının öneki (belirtilmezse PDF adı kullanılır)
         """
         # Hata ayıklama logu ekle
         print(f"DEBUG: generate_dataset başladı - pdf_path: {pdf_path}, output_prefix: {output_prefix}")
-        # PDF'i metin olarak oku
         try:
             print("PDF metni çıkarılıyor...")
-            page_texts = self.pdf_processor.convert_pdf_to_text(pdf_path)
-            print(f"DEBUG: PDF'den {len(page_texts)} sayfa metin çıkarıldı")
+            page_count = self.pdf_processor.get_page_count(pdf_path)
         except Exception as e:
             print(f"HATA: PDF metni çıkarılırken sorun oluştu: {str(e)}")
             raise
-        
+
         # Çıktı dosyası öneğini belirle
         if not output_prefix:
             output_prefix = os.path.splitext(os.path.basename(pdf_path))[0]
-        
-        # Sayfaları batch'ler halinde işle
+
+        # Batch aralıklarını belirle
         batch_size = self.config.batch_size
-        batch_count = 0
-        
-        for batch_index, batch_start in enumerate(range(0, len(page_texts), batch_size)):
-            batch_number = batch_index + 1
-            batch_count = batch_number  # Son batch numarasını sakla
-            print(f"\nBatch {batch_number} başlıyor...")
-            
-            # Batch için sayfaları al
-            batch_end = min(batch_start + batch_size, len(page_texts))
-            batch_pages = page_texts[batch_start:batch_end]
-            
-            # Soru-cevap çiftleri oluştur
-            qa_pairs = self.qa_generator.process_batch(batch_pages, batch_start)
-            
-            # Sonuçları kaydet
-            batch_filename = f"{output_prefix}_batch_{batch_number}"
-            self.output_manager.save_output(qa_pairs, batch_filename)
-            
-            print(f"Batch {batch_number} tamamlandı")
-        
+        ranges = [(lo, min(lo + batch_size, page_count))
+                  for lo in range(0, page_count, batch_size)]
+        batch_count = len(ranges)
+
+        if batch_count == 0:
+            print("Uyarı: PDF boş, işlenecek sayfa yok.")
+            return
+
+        # Aşamalar arası kuyruklar; çıkarma kuyruğu sınırlı tutulur ki
+        # üretici tüm PDF'i bellekte biriktirmesin
+        q_batches = queue.Queue(maxsize=2)
+        q_out = queue.Queue()
+        extract_errors = []
+        write_errors = []
+
+        def _extractor():
+            """1. aşama: sayfa metinlerini batch'ler halinde çıkarır"""
+            try:
+                num_workers = min(self.config.num_workers, batch_count)
+                if num_workers <= 1:
+                    for batch_number, (lo, hi) in enumerate(ranges, 1):
+                        lo, texts = _extract_range(pdf_path, lo, hi)
+                        q_batches.put((batch_number, lo, texts))
+                else:
+                    with concurrent.futures.ProcessPoolExecutor(max_workers=num_workers) as executor:
+                        futures = [executor.submit(_extract_range, pdf_path, lo, hi)
+                                   for lo, hi in ranges]
+                        # Sonuçlar batch sırasıyla kuyruğa konur
+                        for batch_number, future in enumerate(futures, 1):
+                            lo, texts = future.result()
+                            q_batches.put((batch_number, lo, texts))
+            except Exception as e:
+                print(f"HATA: Sayfalar metne dönüştürülürken sorun oluştu: {e}")
+                extract_errors.append(e)
+            finally:
+                q_batches.put(None)  # Akış sonu işareti
+
+        def _writer():
+            """3. aşama: üretilen çiftleri batch dosyalarına kaydeder"""
+            try:
+                while True:
+                    item = q_out.get()
+                    if item is None:  # Akış sonu işareti
+                        break
+                    batch_number, qa_pairs = item
+                    batch_filename = f"{output_prefix}_batch_{batch_number}"
+                    self.output_manager.save_output(qa_pairs, batch_filename)
+                    print(f"Batch {batch_number} tamamlandı")
+            except Exception as e:
+                print(f"HATA: Batch dosyası kaydedilirken sorun oluştu: {e}")
+                write_errors.append(e)
+
+        extractor_thread = threading.Thread(target=_extractor, daemon=True)
+        writer_thread = threading.Thread(target=_writer, daemon=True)
+        extractor_thread.start()
+        writer_thread.start()
+
+        # 2. aşama: ana iş parçacığı soru-cevap üretimini yürütür
+        stream_exhausted = False
+        try:
+            while True:
+                item = q_batches.get()
+                if item is None:  # Akış sonu işareti
+                    stream_exhausted = True
+                    break
+                batch_number, batch_start, batch_pages = item
+                print(f"\nBatch {batch_number} başlıyor...")
+                qa_pairs = self.qa_generator.process_batch(batch_pages, batch_start)
+                q_out.put((batch_number, qa_pairs))
+        finally:
+            q_out.put(None)
+            # 2. aşama hata ile çıktıysa çıkarıcı sınırlı kuyrukta put
+            # üzerinde bekliyor olabilir; join'den önce akış sonu işaretine
+            # kadar kuyruk boşaltılır ki iş parçacığı sonlanabilsin
+            if not stream_exhausted:
+                while q_batches.get() is not None:
+                    pass
+            extractor_thread.join()
+            writer_thread.join()
+
+        if extract_errors:
+            raise extract_errors[0]
+        if write_errors:
+            raise write_errors[0]
+
         # Tüm batch'leri tek bir dosyada birleştir
         print("\nTüm batch'ler birleştiriliyor...")
         self.output_manager.merge_batch_files(output_prefix, batch_count)
-        
-        print(f"\nİşlem tamamlandı. {len(page_texts)} sayfa işlendi.")
 
+        print(f"\nİşlem tamamlandı. {page_count} sayfa işlendi.")
+
+
+def find_pdf_files(root='.'):
+    """Dizin ağacındaki PDF dosyalarını tembel (lazy) olarak üretir
+
+    Önce kök dizinin kendi girdilerine bakılır: üst düzeyde PDF varsa
+    yalnızca onlar döndürülür ve alt ağaçlara (venv, çıktı klasörleri
+    gibi) hiç inilmez. Üst düzeyde PDF yoksa alt dizinler özyineleme
+    yerine açık bir yığınla (stack) ve os.scandir ile gezilir; girdi
+    türleri tek okumada gelen dirent verisinden okunur, girdi başına ek
+    stat çağrısı yapılmaz. Sonuçlar üretildikçe döndürülür, çağıran
+    taraf gerekirse listeye çevirir.
 
-def find_pdf_files(sort_alphabetically=True):
-    """Mevcut dizinde veya alt dizinlerde PDF dosyalarını arar
-    
     Args:
-        sort_alphabetically: PDF dosyalarını alfabetik sıraya göre sırala
-        
+        root: Taramanın başlayacağı dizin
+
+    Yields:
+        Bulunan PDF dosyalarının yolları
+    """
+    top_pdfs = []
+    subdirs = []
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.lower().endswith('.pdf'):
+                    top_pdfs.append(entry.path)
+    except OSError:
+        return
+
+    if top_pdfs:
+        yield from top_pdfs
+        return
+
+    stack = subdirs
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.lower().endswith('.pdf'):
+                    yield entry.path
+
+def _stem(path: str) -> str:
+    """Yolun uzantısız dosya adını döndürür
+
+    os.path.basename + splitext ikilisi her çağrıda normalize edilmiş ara
+    dizgiler üretir; iki rpartition aynı sonucu tek geçişte verir.
+
+    Args:
+        path: Dosya yolu
+
     Returns:
-        PDF dosya yollarının listesi
+        Uzantısı atılmış dosya adı
     """
-    import glob
-    import os
-    
-    # Önce mevcut dizindeki PDF'leri ara
-    pdf_files = glob.glob("*.pdf")
-    
-    # Eğer bulunamadıysa alt dizinlere bak
-    if not pdf_files:
-        pdf_files = glob.glob("**/*.pdf", recursive=True)
-    
-    # Mutlak yolları al
-    pdf_files = [os.path.abspath(pdf) for pdf in pdf_files]
-    
-    # Alfabetik sıralama (isteğe bağlı)
-    if sort_alphabetically and pdf_files:
-        pdf_files.sort()
-    
-    return pdf_files
+    return path.rpartition(os.sep)[2].rpartition('.')[0]
+
+
+# _ensure_dir'in bu çalıştırmada oluşturduğunu bildiği dizinler
+_MADE_DIRS = set()
+
+
+def _ensure_dir(path: str) -> None:
+    """Dizini gerekiyorsa oluşturur; tekrar eden çağrılar syscall yapmaz
+
+    os.makedirs(exist_ok=True) var olan dizin için bile her çağrıda
+    stat atar. Aynı klasöre yazan PDF işleri yüzünden yol tekrar tekrar
+    geldiğinde sonuç bir küme üyelik testiyle geçiştirilir.
+
+    Args:
+        path: Oluşturulacak dizin yolu
+    """
+    if path not in _MADE_DIRS:
+        os.makedirs(path, exist_ok=True)
+        _MADE_DIRS.add(path)
+
+
+def _run_single(args) -> int:
+    """--pdf ile tek dosya verilen çağrılar için kısayol
+
+    Tek PDF işlenirken dizin tarama, seçim menüsü, iş parçacığı havuzu ve
+    kitaplar arası birleştirme adımlarının tamamı gereksizdir; dosya
+    doğrudan işlenir ve program kısa yoldan sonlanır.
+
+    Args:
+        args: Ayrıştırılmış komut satırı argümanları
+
+    Returns:
+        Program çıkış kodu
+    """
+    pdf_path = args.pdf_path
+
+    output_dir = args.output_dir
+    if output_dir:
+        _ensure_dir(output_dir)
+
+    # Çıktı klasörü ve dosya öneki
+    folder_name = args.output if args.output else _stem(pdf_path)
+    pdf_output_dir = os.path.join(output_dir, folder_name) if output_dir else folder_name
+    _ensure_dir(pdf_output_dir)
+    print(f"PDF çıktıları için klasör oluşturuldu: {pdf_output_dir}")
+
+    config = Config(
+        api_key=args.api_key,
+        model=args.model,
+        batch_size=args.batch_size,
+        questions_per_page=args.questions,
+        output_format=args.format,
+        temperature=args.temperature,
+        cache_path=None if args.no_cache else args.cache_path
+    )
+    generator = FineTuneDatasetGenerator(config)
+
+    output_prefix = f"{pdf_output_dir}{os.sep}{folder_name}"
+    try:
+        generator.generate_dataset(pdf_path, output_prefix)
+    except Exception as e:
+        print(f"Hata ({pdf_path.rpartition(os.sep)[2]}): {e}")
+        return 1
+
+    print("\nTüm işlemler tamamlandı. 1 PDF dosyası işlendi.")
+
+    if args.merge_all:
+        print("\n===================================================")
+        print("Farklı PDF'lerden elde edilen veri setlerini birleştirme")
+        print("===================================================\n")
+        OutputManager(config).merge_all_dataset_files()
+
+    return 0
+
 
 def main():
     """Ana program"""
+    # Boru veya cron altında çalışırken input() EOF'a kadar bloklanır;
+    # etkileşimli olmayan oturumlarda seçim sorulmadan tümü işlenir
+    interactive = sys.stdin.isatty()
+
     # Program başlangıcı mesajı
     print("\n============================================")
     print("PDF'den Fine-Tuning Veri Seti Oluşturma Aracı")
@@ -709,13 +2000,25 @@ def main():
                       help=f"Çıktı formatı (varsayılan: {Config.DEFAULT_OUTPUT_FORMAT})")
     parser.add_argument("--temperature", type=float, default=0.7,
                       help="Model yaratıcılık seviyesi (0.0-1.0, varsayılan: 0.7)")
+    parser.add_argument("--cache-path", default=Config.DEFAULT_CACHE_PATH,
+                      help=f"Soru-cevap önbelleği dosyasının yolu (varsayılan: {Config.DEFAULT_CACHE_PATH})")
+    parser.add_argument("--no-cache", action="store_true", default=False,
+                      help="Soru-cevap önbelleğini tamamen devre dışı bırak")
     
     args = parser.parse_args()
-    
+
+    # Tek PDF verilmişse tarama, seçim ve havuz kurulumuna hiç girilmez
+    if args.pdf_path and not args.pdf_directory:
+        return _run_single(args)
+
     # Çıktı dizinini oluştur
     output_dir = args.output_dir
     if output_dir:
-        os.makedirs(output_dir, exist_ok=True)
+        _ensure_dir(output_dir)
+
+    # PDF başına yol üretiminde os.path.join yerine kullanılacak sabit önek;
+    # dizin verilmemişse boş kalır ve yollar göreli üretilir
+    output_dir_prefix = f"{output_dir}{os.sep}" if output_dir else ""
     
     # PDF dosyalarını belirle
     pdf_files_to_process = []
@@ -727,18 +2030,24 @@ def main():
     # PDF dizini belirtilmişse
     elif args.pdf_directory:
         if os.path.isdir(args.pdf_directory):
-            dir_pdf_files = [os.path.join(args.pdf_directory, f) for f in os.listdir(args.pdf_directory) 
-                             if f.lower().endswith('.pdf')]
+            # scandir girdileri tek okumada, tür bilgisiyle birlikte döndürür;
+            # entry.path zaten birleştirilmiş yolu içerir
+            with os.scandir(args.pdf_directory) as entries:
+                dir_pdf_files = [e.path for e in entries
+                                 if e.is_file(follow_symlinks=False) and e.name.lower().endswith('.pdf')]
             if dir_pdf_files:
                 if args.all:
                     pdf_files_to_process.extend(dir_pdf_files)
                 else:
                     print(f"{args.pdf_directory} dizininde {len(dir_pdf_files)} PDF bulundu.")
                     print("Tüm PDF'leri işlemek için --all parametresini kullanın veya işlemek istediğiniz dosyayı seçin:")
-                    for i, pdf in enumerate(dir_pdf_files):
-                        print(f"{i+1}. {os.path.basename(pdf)}")
+                    # Listeyi tek yazma çağrısıyla bas; satır başına print
+                    # her seferinde ayrı bir syscall ve tampon boşaltması yapar
+                    sys.stdout.write('\n'.join(
+                        f"{i+1}. {os.path.basename(pdf)}" for i, pdf in enumerate(dir_pdf_files)) + '\n')
                     try:
-                        choices = input("Seçimleriniz (1,3,5 gibi numaraları virgülle ayırın veya 'hepsi' yazın): ")
+                        choices = ('hepsi' if not interactive or args.all else
+                                   input("Seçimleriniz (1,3,5 gibi numaraları virgülle ayırın veya 'hepsi' yazın): "))
                         if choices.lower() == 'hepsi':
                             pdf_files_to_process.extend(dir_pdf_files)
                         else:
@@ -761,29 +2070,27 @@ def main():
     # PDF belirtilmemişse, otomatik bul
     else:
         print("PDF dosyası otomatik olarak aranıyor...")
-        auto_pdf_files = find_pdf_files()
-        print(f"DEBUG: {len(auto_pdf_files)} PDF dosyası bulundu: {auto_pdf_files}")
+        auto_pdf_files = sorted(os.path.realpath(pdf) for pdf in find_pdf_files())
+        if _DEBUG:
+            print(f"DEBUG: {len(auto_pdf_files)} PDF dosyası bulundu: {auto_pdf_files}")
         if not auto_pdf_files:
             print("Hata: Herhangi bir PDF dosyası bulunamadı. Lütfen PDF dosyasının yolunu belirtin.")
             return 1
         
         if len(auto_pdf_files) == 1:
+            # Tarama dosyayı zaten gördü; varlığını yeniden stat'lamaya gerek yok.
+            # Dosya bu arada silindiyse hata, asıl açıldığı yerde yakalanır.
             pdf_files_to_process.append(auto_pdf_files[0])
-            # Mutlak yolun doğruluğunu kontrol et
-            if os.path.exists(auto_pdf_files[0]):
-                print(f"PDF dosyası otomatik olarak bulundu: {auto_pdf_files[0]}")
-            else:
-                print(f"Uyarı: Bulunan PDF yolu geçerli değil: {auto_pdf_files[0]}")
-                print("Lütfen tam dosya yolunu kontrol edin.")
-                return 1
+            print(f"PDF dosyası otomatik olarak bulundu: {auto_pdf_files[0]}")
         else:
             print("Birden fazla PDF dosyası bulundu. Varsayılan olarak tümü sırayla işlenecek.")
             print("Bulunan PDF'ler:")
-            for i, pdf in enumerate(auto_pdf_files):
-                print(f"{i+1}. {pdf}")
+            sys.stdout.write('\n'.join(
+                f"{i+1}. {pdf}" for i, pdf in enumerate(auto_pdf_files)) + '\n')
             
             try:
-                response = input("Tüm PDF'leri işlemek için Enter'a basın veya belirli dosyaların numaralarını virgülle ayırarak girin: ")
+                response = ('hepsi' if not interactive or args.all else
+                            input("Tüm PDF'leri işlemek için Enter'a basın veya belirli dosyaların numaralarını virgülle ayırarak girin: "))
                 if not response.strip() or response.lower() == 'hepsi' or args.all:
                     print("Tüm PDF'ler sırayla işlenecek...")
                     pdf_files_to_process.extend(auto_pdf_files)
@@ -803,7 +2110,15 @@ def main():
     if not pdf_files_to_process:
         print("Hata: İşlenecek PDF dosyası bulunamadı.")
         return 1
-    
+
+    # Büyük PDF'ler önce dağıtılır (LPT çizelgeleme): en uzun iş kuyruğun
+    # sonuna kalırsa havuzun geri kalanı boşta onu beklerdi
+    if len(pdf_files_to_process) > 1:
+        try:
+            pdf_files_to_process.sort(key=os.path.getsize, reverse=True)
+        except OSError:
+            pass  # Boyutu okunamayan dosya varsa mevcut sıra korunur
+
     # Yapılandırmayı oluştur
     config = Config(
         api_key=args.api_key,
@@ -811,21 +2126,67 @@ def main():
         batch_size=args.batch_size,
         questions_per_page=args.questions,
         output_format=args.format,
-        temperature=args.temperature
+        temperature=args.temperature,
+        cache_path=None if args.no_cache else args.cache_path
     )
-    
-    # Veri seti oluşturucuyu başlat
-    generator = FineTuneDatasetGenerator(config)
+
+    # Üretici iş parçacığına özgü durum taşır: QACache'in SQLite bağlantısı
+    # yalnızca açıldığı iş parçacığında kullanılabilir ve AsyncLimiter tek
+    # bir olay döngüsüne bağlanır. Havuzdaki her iş parçacığı bu yüzden
+    # kendi üreticisini kurar ve üzerine düşen tüm PDF'lerde yeniden kullanır;
+    # SQLite dosyası bağlantılar arasında kendi kilidiyle paylaşılır.
+    thread_state = threading.local()
+
+    def _thread_generator() -> FineTuneDatasetGenerator:
+        generator = getattr(thread_state, 'generator', None)
+        if generator is None:
+            generator = FineTuneDatasetGenerator(config)
+            thread_state.generator = generator
+        return generator
+
+    # Birleştirme adımları için tek bir çıktı yöneticisi; adımlar
+    # yapılandırmayı gerektiğinde güncelleyerek aynı nesneyi kullanır
+    output_manager = OutputManager(config)
     
     # Sonunda birleştirilecek tüm kitap çıktıları
     all_output_files = []
-    
-    # Her PDF'i işle
-    for i, pdf_path in enumerate(pdf_files_to_process):
+    all_output_lock = threading.Lock()
+
+    # Birleştirme etkinse birleşik çıktının yolu işleme başlamadan hesaplanır;
+    # CSV formatında satırlar işlenirken doğrudan birleşik dosyaya akıtılır ve
+    # iş sonunda tüm çıktıları yeniden okuyan ikinci geçiş yapılmaz
+    merged_writer = None
+    merged_output = None
+    if not args.no_merge:
+        # Ana çıktı klasörü oluştur
+        merged_dir = "birlestirilmis_ciktilar"
+        if output_dir:
+            merged_dir = os.path.join(output_dir, merged_dir)
+        _ensure_dir(merged_dir)
+
+        # Birleştirilmiş dosya adı
+        if args.output:
+            merged_output = f"{args.output}_tüm_kitaplar"
+        else:
+            # Eğer belirli bir dizinde işleniyorsa dizin adını kullan
+            if args.pdf_directory:
+                dir_name = os.path.basename(os.path.normpath(args.pdf_directory))
+                merged_output = f"{dir_name}_tüm_kitaplar"
+            else:
+                merged_output = "tüm_kitaplar_birleşik"
+
+        # Birleştirilmiş çıktının tam yolu
+        merged_output = os.path.join(merged_dir, merged_output)
+
+        if config.output_format.lower() == "csv":
+            merged_writer = _MergedCSVWriter(merged_output)
+
+    def process_one_pdf(i: int, pdf_path: str) -> None:
+        """Tek bir PDF'i işleyip çıktısını all_output_files listesine ekler"""
         print(f"\n==============================================")
         print(f"PDF {i+1}/{len(pdf_files_to_process)} işleniyor: {pdf_path}")
         print(f"==============================================")
-        
+
         # PDF için klasör adı oluştur
         if args.output:
             if len(pdf_files_to_process) > 1:
@@ -835,97 +2196,86 @@ def main():
                 folder_name = args.output
         else:
             # PDF adını kullan
-            folder_name = os.path.splitext(os.path.basename(pdf_path))[0]
-        
-        # PDF için özel klasör oluştur
-        if output_dir:
-            pdf_output_dir = os.path.join(output_dir, folder_name)
-        else:
-            pdf_output_dir = folder_name
-        
+            folder_name = _stem(pdf_path)
+
+        # PDF için özel klasör oluştur (önek önceden hesaplandı)
+        pdf_output_dir = f"{output_dir_prefix}{folder_name}"
+
         # Klasörü oluştur
-        os.makedirs(pdf_output_dir, exist_ok=True)
+        _ensure_dir(pdf_output_dir)
         print(f"PDF çıktıları için klasör oluşturuldu: {pdf_output_dir}")
-        
+
         # Çıktı dosyasının öneki (PDF klasörü içindeki temel dosya adı)
         base_output = folder_name
-        output_prefix = os.path.join(pdf_output_dir, base_output)
-        
-        # PDF'i işle
+        output_prefix = f"{pdf_output_dir}{os.sep}{base_output}"
+
+        # PDF'i işle (üretici, çağıran havuz iş parçacığına aittir)
+        _thread_generator().generate_dataset(pdf_path, output_prefix)
+
+        # Son merge dosyasını all_output_files listesine ekle
         try:
-            generator.generate_dataset(pdf_path, output_prefix)
-            
-            # Son merge dosyasını all_output_files listesine ekle
-            try:
-                if not args.no_merge:
-                    # PDF için tüm batch'ı işledikten sonraki birleştirilmiş dosya
-                    final_output = f"{output_prefix}.{config.output_format}"
-                    
-                    # Dosyanın var olup olmadığını kontrol et
-                    if os.path.exists(final_output):
+            if not args.no_merge:
+                # merge_batch_files'ın yazdığı, kitabın tüm batch'lerini
+                # içeren birleşik dosya
+                final_output = f"{output_prefix}_all.{config.output_format}"
+
+                # Dosyanın var olup olmadığını kontrol et
+                if os.path.exists(final_output):
+                    with all_output_lock:
                         all_output_files.append(final_output)
-                    else:
-                        print(f"Uyarı: {final_output} dosyası bulunamadı. Birleştirme için atlanıyor.")
-            except Exception as e:
-                print(f"Uyarı: Çıktı dosyası işlenirken hata oluştu: {e}")
-                
+                    # CSV formatında satırlar birleşik dosyaya hemen akıtılır
+                    if merged_writer is not None:
+                        merged_writer.append_file(final_output)
+                else:
+                    print(f"Uyarı: {final_output} dosyası bulunamadı. Birleştirme için atlanıyor.")
         except Exception as e:
-            print(f"Hata ({os.path.basename(pdf_path)}): {e}")
-            continue
-    
+            print(f"Uyarı: Çıktı dosyası işlenirken hata oluştu: {e}")
+
+    # PDF'ler birbirinden bağımsızdır; API bekleme sürelerinin örtüşmesi için
+    # aynı anda en fazla 4 PDF iş parçacığı havuzunda işlenir
+    pdf_pool_size = min(4, len(pdf_files_to_process))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=pdf_pool_size) as pdf_pool:
+        futures = {pdf_pool.submit(process_one_pdf, i, pdf_path): pdf_path
+                   for i, pdf_path in enumerate(pdf_files_to_process)}
+        failed_count = 0
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                # Bir PDF'in hatası diğerlerinin işlenmesini engellemez
+                failed_count += 1
+                print(f"Hata ({futures[future].rpartition(os.sep)[2]}): {e}")
+
+    if failed_count == len(pdf_files_to_process):
+        print("\nHata: Hiçbir PDF dosyası işlenemedi.")
+        return 1
+
     # Tüm kitapların çıktılarını birleştir
-    if not args.no_merge and len(all_output_files) > 0:
+    if merged_writer is not None:
+        # Satırlar işleme sırasında akıtıldı; burada yalnızca dosya kapatılır
+        merged_writer.close()
+        if merged_writer.total_rows:
+            print(f"Tüm kitaplar başarıyla tek bir CSV'de birleştirildi: {merged_output}.csv")
+            print(f"CSV dosyası şu konumda: {os.path.abspath(merged_output)}.csv")
+    elif not args.no_merge and len(all_output_files) > 0:
         print("\nTüm kitapların çıktıları birleştiriliyor...")
-        
-        # Ana çıktı klasörü oluştur
-        merged_dir = "birlestirilmis_ciktilar"
-        if output_dir:
-            merged_dir = os.path.join(output_dir, merged_dir)
-        
-        # Klasörü oluştur
-        os.makedirs(merged_dir, exist_ok=True)
-        print(f"Birleştirilmiş çıktılar için klasör oluşturuldu: {merged_dir}")
-        
-        # Birleştirilmiş dosya adı
-        if args.output:
-            merged_output = f"{args.output}_tüm_kitaplar"
-        else:
-            # Eğer belirli bir dizinde işleniyorsa dizin adını kullan
-            if args.pdf_directory:
-                dir_name = os.path.basename(os.path.normpath(args.pdf_directory))
-                merged_output = f"{dir_name}_tüm_kitaplar"
-            else:
-                merged_output = "tüm_kitaplar_birleşik"
-        
-        print(f"DEBUG: Birleştirilecek dosyalar: {valid_files}")
-        
-        # Birleştirilmiş çıktının tam yolu
-        merged_output = os.path.join(merged_dir, merged_output)
-        
-                # Birleştirilecek dosya listesini kontrol et
-        valid_files = [f for f in all_output_files if os.path.exists(f)]
-        
-        if not valid_files:
-            print("Uyarı: Birleştirilecek geçerli dosya bulunamadı.")
-        else:
-            print(f"Birleştiriliyor: {len(valid_files)} dosya")
-            # Tüm dosyaları her zaman CSV formatında birleştir (kullanıcı her format için çıktı üretebilir,
-            # ama birleştirme her zaman CSV'de yapılacak)
-            merge_config = Config(
-                api_key=config.api_key,
-                model=config.model,
-                batch_size=config.batch_size,
-                questions_per_page=config.questions_per_page,
-                output_format="csv",  # Birleştirilen dosyayı CSV olarak kaydet
-                temperature=config.temperature
-            )
-            
-            OutputManager(merge_config).merge_multiple_files(valid_files, merged_output)
-        
+
+        # Listedeki dosyalar eklenmeden hemen önce varlık kontrolünden
+        # geçti; burada her biri için yeni bir stat turu atılmaz
+        if _DEBUG:
+            print(f"DEBUG: Birleştirilecek dosyalar: {all_output_files}")
+
+        print(f"Birleştiriliyor: {len(all_output_files)} dosya")
+        # Bu dal yalnızca JSON formatında çalışır (CSV'de satırlar işleme
+        # sırasında akıtılır); birleşik dosya yine CSV üretilir ama JSON
+        # gövdeleri bayt olarak yapıştırılamayacağı için öğeler ayrıştırılıp
+        # satırlara çevrilir
+        output_manager.merge_json_files_to_csv(all_output_files, merged_output)
+
         print(f"Tüm kitaplar başarıyla tek bir CSV'de birleştirildi: {merged_output}.csv")
         print(f"CSV dosyası şu konumda: {os.path.abspath(merged_output)}.csv")
     
-    print(f"\nTüm işlemler tamamlandı. {len(pdf_files_to_process)} PDF dosyası işlendi.")
+    print(f"\nTüm işlemler tamamlandı. {len(pdf_files_to_process) - failed_count} PDF dosyası işlendi.")
     
     # Tüm PDF'ler işlendikten sonra, eğer --merge-all parametresi belirtilmişse
     # farklı PDF'lerden elde edilen _all dosyalarını birleştir
@@ -933,7 +2283,7 @@ def main():
         print("\n===================================================")
         print("Farklı PDF'lerden elde edilen veri setlerini birleştirme")
         print("===================================================\n")
-        output_manager = OutputManager(config)
+        output_manager.config = config
         output_manager.merge_all_dataset_files()
     
     return 0
@@ -941,6 +2291,10 @@ def main():
 
 if __name__ == "__main__":
     try:
+        # Boru/dosyaya yazarken satır başına flush yapılmasın; terminalde
+        # satır tamponlama korunur ki ilerleme anında görünsün
+        if not sys.stdout.isatty():
+            sys.stdout.reconfigure(line_buffering=False)
         print("Program başlıyor...")
         exit(main())
     except KeyboardInterrupt:
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 import os
 import sys
-import time
 
 print("Python versiyonu:", sys.version)
 print("API Anahtarı kontrol ediliyor...")
@@ -22,11 +21,16 @@ try:
     print("\nGemini API'ye bağlanmaya çalışılıyor...")
     genai.configure(api_key=api_key)
     
-    # Liste kullanılabilir modelleri
-    print("\nKullanılabilir modeller listeleniyor...")
-    models = genai.list_models()
-    for model in models:
-        print(f"- {model.name}")
+    # Bağlantıyı doğrulamak için tek model yeterli; tam liste sayfalı API
+    # çağrılarıyla uzun sürer ve yalnızca VERBOSE_MODELS=1 ile istenirse çekilir
+    print("\nKullanılabilir modeller kontrol ediliyor...")
+    if os.environ.get("VERBOSE_MODELS"):
+        for model in genai.list_models():
+            print(f"- {model.name}")
+    else:
+        first_model = next(iter(genai.list_models()), None)
+        if first_model:
+            print(f"- {first_model.name} (tam liste için VERBOSE_MODELS=1 ayarlayın)")
     
     print("\nBasit bir test isteği gönderiliyor...")
     model = genai.GenerativeModel('gemini-2.0-flash')